@@ -0,0 +1,105 @@
+"""
+Regression check of the options that promise exactly the same results as the default run, without UI.
+- `--body_pool`: the distance reached by each car of each generation is the same as with new bodies,
+  with a genetic algorithm that mutates the cars, since the results of Box2D depend on the order of the bodies.
+- `--jobs`: the score of each game played in a worker process is the same as in a sequential run.
+The exit code is 1 when a result differs.
+Usage (from the repository root): python3 benchmarks/determinism.py [--seed_terrain 42] [--seed_car 666]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import main
+from Game import Game
+from Genome import Genome
+from Simulation import Simulation
+
+# Seed of the mutations of the genetic algorithm
+SEED_MUTATIONS = 1
+
+
+def mutating_generation(seed: int):
+    """
+    Gives a next_generation function that keeps the best half of the cars and adds mutated copies of them,
+    and that records the distance reached by the cars of each generation.
+    :param seed: seed of the mutations
+    :return: the function, and the list where the distances of each generation are appended
+    """
+    rng = random.Random(seed)
+    distances = []
+
+    def next_generation(world, population: list) -> list:
+        distances.append([car.max_dist for car in population])
+        parents = sorted(population, key=lambda car: car.max_dist, reverse=True)[:(len(population) + 1) // 2]
+        genomes = [Genome.from_car(car) for car in parents]
+        for genome in genomes[:len(population) - len(parents)]:
+            genomes.append(Genome([radius * rng.uniform(0.8, 1.2) for radius in genome.wheel_radius],
+                                  genome.wheel_vertex, genome.motor_wheel_index,
+                                  [(x * rng.uniform(0.8, 1.2), y * rng.uniform(0.8, 1.2))
+                                   for x, y in genome.chassis_vertex]))
+        return [genome.create_car(world) for genome in genomes]
+
+    return next_generation, distances
+
+
+def body_pool_distances(seed_terrain: int, seed_car: int, body_pool: bool) -> list:
+    """
+    Plays a game with the mutating genetic algorithm.
+    :param seed_terrain: seed for the terrain
+    :param seed_car: seed for the first generation of cars
+    :param body_pool: whether the bodies of the dead cars are reused
+    :return: the distance reached by each car of each generation
+    """
+    next_generation, distances = mutating_generation(SEED_MUTATIONS)
+    simulation = Simulation(seed_terrain, body_pool=body_pool)
+    simulation.run(next_generation, seed_car)
+    return distances
+
+
+def game_scores(seed_terrain: int, seed_car: int, jobs: int) -> list:
+    """
+    Plays the games of main.py, sequentially or in worker processes as with --jobs.
+    :param seed_terrain: seed for the terrain
+    :param seed_car: seed for the first generation of cars
+    :param jobs: number of worker processes, 1 to play the games sequentially
+    :return: the score and the generation scores of each game
+    """
+    games = range(1, main.number_of_games + 1)
+    if jobs == 1:
+        return [(game.score, game.generation_scores)
+                for game in (Game(main.next_generation, False, seed_terrain, seed_car, False) for _ in games)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(main.run_game, games, [seed_terrain] * len(games), [seed_car] * len(games),
+                               [False] * len(games), [None] * len(games), [None] * len(games), [None] * len(games),
+                               [None] * len(games), [False] * len(games), [{}] * len(games))
+        return [(score, generation_scores) for score, generation_scores, _, _ in results]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed_terrain", help="Seed for the terrain (default: 42)", type=int, default=42)
+    parser.add_argument("--seed_car", help="Seed for the cars (default: 666)", type=int, default=666)
+    parser.add_argument("--jobs", help="Worker processes of the --jobs check (default: 2)", type=int, default=2)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    ok = True
+    fresh = body_pool_distances(args.seed_terrain, args.seed_car, False)
+    pooled = body_pool_distances(args.seed_terrain, args.seed_car, True)
+    same = fresh == pooled
+    ok = ok and same
+    print("body_pool: {} generations, {}".format(len(fresh), "same distances" if same else "DISTANCES DIFFER"))
+
+    sequential = game_scores(args.seed_terrain, args.seed_car, 1)
+    parallel = game_scores(args.seed_terrain, args.seed_car, args.jobs)
+    same = sequential == parallel
+    ok = ok and same
+    print("jobs: {} games, {}".format(len(sequential), "same scores" if same else "SCORES DIFFER"))
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,65 @@
+"""
+Benchmark of the physics step time against the population size, without UI.
+Usage (from the repository root): python3 benchmarks/population.py [--sizes 20 100 1000] [--steps 300]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from Simulation import Simulation
+
+
+def measure(population_size: int, steps: int, seed_terrain: int, seed_car: int) -> dict:
+    """
+    Simulates the first generation of a game for a number of steps.
+    :param population_size: number of cars
+    :param steps: number of physics steps
+    :param seed_terrain: seed for the terrain
+    :param seed_car: seed for the cars
+    :return: the timings of the run
+    """
+    simulation = Simulation(seed_terrain, population_size=population_size)
+    simulation.create_first_generation(seed_car)
+    simulation.update_car_data()
+    step_time = 0.0
+    update_time = 0.0
+    max_contacts = 0
+    for _ in range(steps):
+        start = time.perf_counter()
+        simulation.world.Step(simulation.time_step, simulation.velocity_iterations, simulation.position_iterations)
+        step_time += time.perf_counter() - start
+        simulation.steps += 1
+        start = time.perf_counter()
+        simulation.update_car_data()
+        update_time += time.perf_counter() - start
+        max_contacts = max(max_contacts, simulation.world.contactCount)
+    return {
+        "population_size": population_size,
+        "step_us": step_time / steps * 1e6,
+        "update_us": update_time / steps * 1e6,
+        "step_us_per_car": step_time / steps / population_size * 1e6,
+        "proxies": simulation.world.proxyCount,
+        "max_contacts": max_contacts,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", help="Population sizes (default: 20 50 100 200 500 1000)", type=int, nargs="+",
+                        default=[20, 50, 100, 200, 500, 1000])
+    parser.add_argument("--steps", help="Physics steps per population size (default: 300)", type=int, default=300)
+    parser.add_argument("--seed_terrain", help="Seed for the terrain (default: 42)", type=int, default=42)
+    parser.add_argument("--seed_car", help="Seed for the cars (default: 666)", type=int, default=666)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print("{:>10} {:>12} {:>12} {:>14} {:>8} {:>9}".format("cars", "step (us)", "update (us)", "step/car (us)",
+                                                          "proxies", "contacts"))
+    for size in args.sizes:
+        result = measure(size, args.steps, args.seed_terrain, args.seed_car)
+        print("{population_size:>10} {step_us:>12.1f} {update_us:>12.1f} {step_us_per_car:>14.2f} "
+              "{proxies:>8} {max_contacts:>9}".format(**result))
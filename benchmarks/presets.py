@@ -0,0 +1,87 @@
+"""
+Comparison of the physics presets with the standard one, without UI.
+For each preset, random populations are simulated on several terrains, and the ranking of their cars by distance
+is compared with the one given by the standard preset: rank correlation, agreement on the best cars,
+and distance differences. The speed-up of the preset is given as well.
+Usage (from the repository root): python3 benchmarks/presets.py [--population_size 50] [--seeds_terrain 42 1 2]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from Simulation import Simulation, PHYSICS_PRESETS, DEFAULT_PHYSICS
+
+
+def distances(preset: str, population_size: int, seed_terrain: int, seed_car: int) -> tuple:
+    """
+    Simulates the first generation of a game with a physics preset.
+    :param preset: name of the physics preset
+    :param population_size: number of cars
+    :param seed_terrain: seed for the terrain
+    :param seed_car: seed for the cars
+    :return: the maximum distance reached by each car, and the wall time of the run
+    """
+    simulation = Simulation(seed_terrain, population_size=population_size, **PHYSICS_PRESETS[preset])
+    simulation.create_first_generation(seed_car)
+    simulation.update_car_data()
+    start = time.perf_counter()
+    simulation.run_generation()
+    return np.array([car.max_dist for car in simulation.population]), time.perf_counter() - start
+
+
+def ranks(values: np.ndarray) -> np.ndarray:
+    """
+    Gives the rank of each value, from 0 for the smallest one, with the average rank for ties.
+    """
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(len(values))
+    for value in np.unique(values):
+        tied = values == value
+        ranks[tied] = ranks[tied].mean()
+    return ranks
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Gives the Spearman rank correlation of two lists of values: 1 when they rank the cars in the same order.
+    """
+    return float(np.corrcoef(ranks(a), ranks(b))[0, 1])
+
+
+def top_overlap(a: np.ndarray, b: np.ndarray, k: int) -> float:
+    """
+    Gives the share of the k best cars according to a that are also among the k best cars according to b.
+    """
+    k = min(k, len(a))
+    return len(set(np.argsort(-a)[:k]) & set(np.argsort(-b)[:k])) / k
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--population_size", help="Cars per population (default: 50)", type=int, default=50)
+    parser.add_argument("--seeds_terrain", help="Seeds for the terrains (default: 42 1 2)", type=int, nargs="+",
+                        default=[42, 1, 2])
+    parser.add_argument("--seed_car", help="Seed for the cars (default: 666)", type=int, default=666)
+    parser.add_argument("--top", help="Number of best cars compared (default: 5)", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    reference = {seed: distances(DEFAULT_PHYSICS, args.population_size, seed, args.seed_car)
+                 for seed in args.seeds_terrain}
+    print("{:<10}{:>6}{:>10}{:>10}{:>9}{:>15}{:>16}{:>10}".format(
+        "preset", "seed", "spearman", "top {}".format(args.top), "best", "best standard", "mean |diff| (m)",
+        "speed-up"))
+    for preset in PHYSICS_PRESETS:
+        for seed in args.seeds_terrain:
+            standard, standard_time = reference[seed]
+            result, wall_time = distances(preset, args.population_size, seed, args.seed_car)
+            print("{:<10}{:>6}{:>10.3f}{:>10.2f}{:>9.1f}{:>15.1f}{:>16.2f}{:>9.2f}x".format(
+                preset, seed, spearman(result, standard), top_overlap(result, standard, args.top), result.max(),
+                standard.max(), float(np.abs(result - standard).mean()), standard_time / wall_time))
@@ -0,0 +1,208 @@
+"""
+Benchmark suite of the simulation throughput, without UI, for fixed seeds.
+It measures the physics steps and the cars simulated per second for several population sizes, terrain lengths,
+Box2D solver iteration counts and over several generations (with and without BodyPool), and the wall time of a run equivalent to `python3 main.py --no_UI`.
+The results are compared with a baseline JSON file, and the exit code is 1 when a case got slower than
+the tolerance or when the score of the full run changed.
+The timings are only comparable on the same idle machine: save a baseline there before changing anything.
+Usage (from the repository root): python3 benchmarks/suite.py [--save_baseline] [--repeat 5] [--no_full_run]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import Box2D
+
+from Genome import Genome
+from Simulation import Simulation
+
+# Default baseline file, next to this script
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Cases of the suite: keyword arguments of Simulation
+CASES = {
+    "population=20": {"population_size": 20},
+    "population=50": {"population_size": 50},
+    "population=100": {"population_size": 100},
+    "floor_tiles=50": {"floor_tiles": 50},
+    "floor_tiles=400": {"floor_tiles": 400},
+    "iterations=8,3": {"velocity_iterations": 8, "position_iterations": 3},
+    "iterations=4,2": {"velocity_iterations": 4, "position_iterations": 2},
+    "generations=3": {},
+    "generations=3,body_pool": {"body_pool": True},
+}
+# Number of generations simulated by the cases that need more than the first one,
+# e.g. the bodies of a BodyPool are only reused from the second generation
+GENERATIONS = {
+    "generations=3": 3,
+    "generations=3,body_pool": 3,
+}
+# Maximum duration of each generation simulated by a case (in simulated seconds)
+MAX_SIM_TIME = 20
+
+
+def clone_generation(world, population: list) -> list:
+    """
+    Creates the next generation of cars as a copy of the previous one, like the default next_generation of main.py.
+    """
+    return [Genome.from_car(car).create_car(world) for car in population]
+
+
+def measure_generation(options: dict, seed_terrain: int, seed_car: int, repeat: int, generations: int = 1) -> dict:
+    """
+    Simulates the first generations of a game, and keeps the fastest of several runs.
+    :param options: keyword arguments of Simulation
+    :param seed_terrain: seed for the terrain
+    :param seed_car: seed for the cars
+    :param repeat: number of runs
+    :param generations: number of generations, each one a copy of the previous one
+    :return: the measures of the fastest run
+    """
+    best = None
+    for _ in range(repeat):
+        simulation = Simulation(seed_terrain, max_sim_time=MAX_SIM_TIME, **options)
+        simulation.create_first_generation(seed_car)
+        simulation.update_car_data()
+        steps = 0
+        start = time.perf_counter()
+        for generation in range(generations):
+            if generation > 0:
+                simulation.end_generation(clone_generation)
+            simulation.run_generation()
+            steps += simulation.steps
+        wall_time = time.perf_counter() - start
+        if best is None or wall_time < best["wall_time"]:
+            best = {
+                "wall_time": wall_time,
+                "steps": steps,
+                "steps_per_s": steps / wall_time,
+                "cars_per_s": generations * len(simulation.population) / wall_time,
+                "score": max([simulation.score] + [car.max_dist for car in simulation.population]),
+            }
+    return best
+
+
+def measure_full_run(seed_terrain: int, seed_car: int, repeat: int) -> dict:
+    """
+    Plays the games of main.py without UI, and keeps the fastest of several runs.
+    :param seed_terrain: seed for the terrain
+    :param seed_car: seed for the cars
+    :param repeat: number of runs
+    :return: the measures of the fastest run, with its final score
+    """
+    import main
+    from Game import Game
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scores = [Game(main.next_generation, False, seed_terrain, seed_car, False).score
+                  for _ in range(main.number_of_games)]
+        wall_time = time.perf_counter() - start
+        if best is None or wall_time < best["wall_time"]:
+            best = {"wall_time": wall_time, "score": sum(scores) / len(scores)}
+    return best
+
+
+def environment() -> dict:
+    """
+    Describes the machine and the libraries, since the timings are only comparable on the same ones.
+    """
+    return {
+        "python": platform.python_version(),
+        "box2d": Box2D.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Prints the results next to the baseline.
+    :param results: the results of this run
+    :param baseline: the results of the baseline run
+    :param tolerance: relative slowdown above which a case is reported as a regression
+    :return: True if no case got slower than the tolerance and the scores did not change
+    """
+    ok = True
+    print("{:<26}{:>12}{:>12}{:>12}{:>9}  {}".format("case", "steps/s", "cars/s", "baseline", "change", "status"))
+    for name, result in results["cases"].items():
+        reference = baseline.get("cases", {}).get(name)
+        if reference is None:
+            print("{:<26}{:>12.0f}{:>12.1f}{:>12}{:>9}  {}".format(name, result["steps_per_s"], result["cars_per_s"],
+                                                                  "-", "-", "new"))
+            continue
+        change = result["steps_per_s"] / reference["steps_per_s"] - 1
+        status = "ok"
+        if change < -tolerance:
+            status = "SLOWER"
+            ok = False
+        if result["score"] != reference["score"]:
+            status += ", score changed"
+        print("{:<26}{:>12.0f}{:>12.1f}{:>12.0f}{:>8.1f}%  {}".format(name, result["steps_per_s"], result["cars_per_s"],
+                                                                     reference["steps_per_s"], 100 * change, status))
+    full_run = results.get("full_run")
+    if full_run is not None:
+        reference = baseline.get("full_run")
+        if reference is None:
+            print("full run: {:.2f} s, score {}".format(full_run["wall_time"], full_run["score"]))
+        else:
+            change = full_run["wall_time"] / reference["wall_time"] - 1
+            status = "ok"
+            if change > tolerance:
+                status = "SLOWER"
+                ok = False
+            if full_run["score"] != reference["score"]:
+                status += ", SCORE CHANGED from {}".format(reference["score"])
+                ok = False
+            print("full run: {:.2f} s (baseline {:.2f} s, {:+.1f}%), score {}  {}".format(
+                full_run["wall_time"], reference["wall_time"], 100 * change, full_run["score"], status))
+    if baseline.get("environment") not in (None, results["environment"]):
+        print("Note: the baseline was measured on another environment: {}".format(baseline["environment"]))
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", help="Baseline JSON file (default: benchmarks/baseline.json)", default=BASELINE)
+    parser.add_argument("--save_baseline", help="Save the results as the new baseline", action="store_true")
+    parser.add_argument("--output", help="JSON file where the results are written (default: none)", default=None)
+    parser.add_argument("--repeat", help="Runs of each case, the fastest one is kept (default: 5)", type=int, default=5)
+    parser.add_argument("--tolerance", help="Relative slowdown reported as a regression (default: 0.25)", type=float,
+                        default=0.25)
+    parser.add_argument("--no_full_run", help="Do not measure the run equivalent to main.py", action="store_true")
+    parser.add_argument("--seed_terrain", help="Seed for the terrain (default: 42)", type=int, default=42)
+    parser.add_argument("--seed_car", help="Seed for the cars (default: 666)", type=int, default=666)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    results = {"environment": environment(), "seed_terrain": args.seed_terrain, "seed_car": args.seed_car,
+               "cases": {}}
+    for name, options in CASES.items():
+        results["cases"][name] = measure_generation(options, args.seed_terrain, args.seed_car, args.repeat,
+                                                    GENERATIONS.get(name, 1))
+    if not args.no_full_run:
+        results["full_run"] = measure_full_run(args.seed_terrain, args.seed_car, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get("seed_terrain"), baseline.get("seed_car")) != (args.seed_terrain, args.seed_car):
+            print("Note: the baseline was measured with other seeds, its scores are not comparable")
+    ok = compare(results, baseline, args.tolerance)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Baseline saved to " + args.baseline)
+    elif not ok:
+        sys.exit(1)
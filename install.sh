@@ -2,4 +2,4 @@ sudo apt-get install build-essential python-dev swig python3-pygame
 
 # python package
 echo 'Install python package'
-pip3 install pygame box2d matplotlib argparse box2d-kengz
\ No newline at end of file
+pip3 install pygame box2d matplotlib argparse numpy box2d-kengz
\ No newline at end of file
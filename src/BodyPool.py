@@ -0,0 +1,97 @@
+import heapq
+from typing import List
+
+from Box2D import b2World, b2Body, b2BodyDef, b2Vec2
+
+
+class BodyPool:
+    """
+    A pool of the dynamic bodies of the dead cars, which are kept inactive in the world and re-skinned
+    for the next cars instead of being destroyed and created again.
+    Box2D results depend on the order of the bodies in the world and on the ids of their broad-phase proxies.
+    A new body is put first in the world, so the pool reuses the bodies in the order they were created:
+    the bodies of a new population are then in the same order as new ones, and their proxies get the same ids,
+    so that the cars reach the same distances as with new bodies.
+    """
+
+    def __init__(self, world: b2World, position: b2Vec2):
+        """
+        Initializes an object of class BodyPool, and attaches it to the world: the chassis and the wheels
+        of the cars created in this world then take their body from the pool.
+        :param world: b2World of the cars
+        :param position: position where the cars are created
+        """
+        self.world = world
+        self.position = b2Vec2(position)
+        self.created = 0  # number of bodies created by the pool
+        self.free = []  # heap of the inactive bodies, as (creation number, body)
+        world.body_pool = self
+
+    def __len__(self) -> int:
+        """
+        Gives the number of inactive bodies in the pool.
+        """
+        return len(self.free)
+
+    @staticmethod
+    def create_body(world: b2World, body_def: b2BodyDef) -> b2Body:
+        """
+        Creates a dynamic body without fixture, taken from the pool of the world if it has one.
+        :param world: b2World where the body will be used
+        :param body_def: definition of the body
+        :return: the body
+        """
+        pool = getattr(world, "body_pool", None)
+        if pool is None:
+            return world.CreateBody(body_def)
+        return pool.acquire(body_def)
+
+    def acquire(self, body_def: b2BodyDef) -> b2Body:
+        """
+        Gives the first created inactive body of the pool, reset as if it was created from a definition,
+        or a new body when the pool is empty.
+        :param body_def: definition of the body
+        :return: the body, active and without fixture
+        """
+        if not self.free:
+            body = self.world.CreateBody(body_def)
+            body.pool_number = self.created
+            self.created += 1
+            return body
+        _, body = heapq.heappop(self.free)
+        if (body.position.x, body.position.y, body.angle) != (body_def.position.x, body_def.position.y,
+                                                             body_def.angle):
+            body.transform = (body_def.position, body_def.angle)
+        body.active = True
+        return body
+
+    def release(self, bodies: List[b2Body]) -> None:
+        """
+        Puts the bodies of a dead car in the pool: their joints are destroyed, and they are made inactive,
+        which removes them from the broad-phase in the same order as if they were destroyed.
+        They are then reset as new bodies at the position of the next cars, without fixture: moving a body
+        looks for new contacts in the whole broad-phase, which is cheap between two physics steps,
+        but not while a population is created.
+        :param bodies: the bodies of the car, in the order in which they would be destroyed
+        """
+        for body in bodies:
+            for edge in list(body.joints):
+                self.world.DestroyJoint(edge.joint)
+        for body in bodies:
+            body.active = False
+        for body in bodies:
+            for fixture in list(body.fixtures):
+                body.DestroyFixture(fixture)
+            body.transform = (self.position, 0)
+            body.linearVelocity = (0, 0)
+            body.angularVelocity = 0
+            # Going to sleep resets the sleep time, and waking up is the initial state of a body
+            body.awake = False
+            body.awake = True
+            heapq.heappush(self.free, (body.pool_number, body))
+
+    def bodies(self) -> List[b2Body]:
+        """
+        Gives the inactive bodies of the pool.
+        """
+        return [body for _, body in self.free]
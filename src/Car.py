@@ -4,8 +4,10 @@ from Wheel import Wheel
 from Chassis import Chassis
 from Box2D import b2RevoluteJointDef, b2Vec2, b2World
 import random
-import logging
-from CustomFormatter import CustomFormatter
+from CustomFormatter import get_logger
+from PopulationState import PopulationState, StateField
+
+log = get_logger('car')
 
 
 class Car:
@@ -19,6 +21,17 @@ class Car:
     max_health = 100
     motorSpeed = 25
 
+    # State in game, stored in a PopulationState while the Car is simulated
+    state = None
+    index = None
+    health = StateField('health', int)
+    isDead = StateField('dead', bool)
+    linear_vel = StateField('linear_vel', float)
+    max_dist = StateField('max_dist', float)
+    stagnation_dist = StateField('stagnation_dist', float)
+    stagnation_step = StateField('stagnation_step', int)
+    state_fields = ('health', 'isDead', 'linear_vel', 'max_dist', 'stagnation_dist', 'stagnation_step', 'xy_pos')
+
     def __init__(self, world: b2World, wheel_radius: List[float], wheel_vertex: List[int], motor_wheel_index: int, chassis_vertex: List[b2Vec2]):
         """
         Initializes an object of class Car.
@@ -29,15 +42,8 @@ class Car:
         :param chassis_vertex: list of the chassis vertices
         """
 
-        # Create logger
-        ch = logging.StreamHandler()
-        ch.setLevel(logging.INFO)
-        ch.setFormatter(CustomFormatter())
-        self.log = logging.getLogger('car')
-        logging.basicConfig(level=logging.INFO)
-        self.log.setLevel(logging.INFO)
-        self.log.addHandler(ch)
-        self.log.propagate = False
+        # Logger, shared by all the cars
+        self.log = log
 
         assert len(wheel_radius) == 2, "A car can only have 2 wheels"
         assert len(wheel_vertex) == 2, "A car can only have 2 wheels"
@@ -85,6 +91,9 @@ class Car:
         self.linear_vel = 0
         self.xy_pos = (0, 0)
         self.max_dist = 0
+        # Stagnation detection: distance where the car settled, and step at which it settled there
+        self.stagnation_dist = 0
+        self.stagnation_step = 0
 
     @staticmethod
     def create_random_car(world: b2World, seed: int, seed_index: int):
@@ -124,6 +133,35 @@ class Car:
 
         return Car(world, wheel_radius_values, wheel_vertex_values, motor_wheel_index, chassis_vertex_values)
 
+    @property
+    def xy_pos(self):
+        """
+        Position of this Car.
+        """
+        if self.state is None:
+            return self._xy_pos
+        return self.state.x[self.index], self.state.y[self.index]
+
+    @xy_pos.setter
+    def xy_pos(self, pos) -> None:
+        if self.state is None:
+            self._xy_pos = pos
+        else:
+            self.state.x[self.index], self.state.y[self.index] = pos[0], pos[1]
+            self.state.version += 1
+
+    def bind(self, state, index: int) -> None:
+        """
+        Moves the state of this Car into a PopulationState, of which its attributes become views.
+        :param state: the PopulationState
+        :param index: index of this Car in the PopulationState
+        """
+        values = [getattr(self, name) for name in Car.state_fields]
+        self.state = state
+        self.index = index
+        for name, value in zip(Car.state_fields, values):
+            setattr(self, name, value)
+
     def kill(self) -> None:
         """
         Kills this Car.
@@ -133,9 +171,9 @@ class Car:
 
     def dcr_health(self) -> None:
         """
-        Decreases this Car's health by 2.
+        Decreases this Car's health, by the health decrement of its PopulationState if it is bound to one.
         """
-        self.health -= 2
+        self.health -= PopulationState.health_decrement if self.state is None else self.state.health_decrement
 
     def set_pos_and_vel(self, pos: b2Vec2, vel: b2Vec2) -> None:
         """
@@ -2,6 +2,8 @@
 from Box2D import b2World, b2BodyDef, b2FixtureDef, b2PolygonShape, b2_dynamicBody, b2Vec2
 # Type alias
 from typing import List
+from Terrain import Terrain
+from BodyPool import BodyPool
 
 
 class Chassis:
@@ -16,6 +18,9 @@ class Chassis:
     maxDensity = 100
     density = 5
     number_of_vertices = 4
+    # Collision filtering: cars only collide with the terrain, never with each other
+    category_bits = 0x0002
+    mask_bits = Terrain.category_bits
 
     def __init__(self, world: b2World, vertex_list: List[b2Vec2], position: b2Vec2):
         """
@@ -30,7 +35,7 @@ class Chassis:
         body_def = b2BodyDef()
         body_def.type = b2_dynamicBody
         body_def.position.Set(position.x, position.y)
-        self.body = world.CreateBody(body_def)
+        self.body = BodyPool.create_body(world, body_def)
 
         # Create part by part
         num_parts = len(vertex_list)
@@ -52,5 +57,7 @@ class Chassis:
         fix_def.friction = 10
         fix_def.restitution = 0.0
         fix_def.filter.groupIndex = -1
+        fix_def.filter.categoryBits = Chassis.category_bits
+        fix_def.filter.maskBits = Chassis.mask_bits
         fix_def.shape = b2PolygonShape(vertices=vertex_list)
         self.body.CreateFixture(fix_def)
@@ -0,0 +1,83 @@
+import base64
+import json
+import os
+from typing import List, Optional
+
+from Genome import Genome
+
+
+class Checkpoint:
+    """
+    A class that represents the state of a game between two generations, so that an interrupted game
+    can be resumed from its last completed generation instead of being played again from the start.
+    """
+
+    def __init__(self, seed_terrain: int, seed_car: int, settings: list, generation: int, score: float,
+                 generation_scores: List[float], genomes: List[Genome], random_state: tuple):
+        """
+        Initializes an object of class Checkpoint.
+        :param seed_terrain: seed for the terrain of the game
+        :param seed_car: seed for the first generation of cars of the game
+        :param settings: other settings of the game that change its results, a checkpoint is only resumed
+        with the same ones
+        :param generation: number of generations completed
+        :param score: score of the game so far
+        :param generation_scores: score of each completed generation, in order
+        :param genomes: genomes of the population of the next generation
+        :param random_state: state of the random module after the creation of this population, as given by
+        random.getstate()
+        """
+        self.seed_terrain = seed_terrain
+        self.seed_car = seed_car
+        self.settings = settings
+        self.generation = generation
+        self.score = score
+        self.generation_scores = generation_scores
+        self.genomes = genomes
+        self.random_state = random_state
+
+    def matches(self, seed_terrain: int, seed_car: int, settings: list) -> bool:
+        """
+        Tells whether this checkpoint was written by a game with the given seeds and settings.
+        """
+        # Settings are compared as they are stored in JSON, where tuples become lists
+        return (self.seed_terrain, self.seed_car, self.settings) == (seed_terrain, seed_car,
+                                                                     json.loads(json.dumps(settings)))
+
+    def save(self, path: str) -> None:
+        """
+        Saves this checkpoint to a JSON file.
+        The file is replaced atomically, so that the previous checkpoint is kept if the game is stopped meanwhile.
+        :param path: the file
+        """
+        version, internal_state, gauss_next = self.random_state
+        data = {
+            "seed_terrain": self.seed_terrain,
+            "seed_car": self.seed_car,
+            "settings": self.settings,
+            "generation": self.generation,
+            "score": self.score,
+            "generation_scores": self.generation_scores,
+            "genomes": base64.b64encode(Genome.pack(self.genomes)).decode("ascii"),
+            "random_state": [version, list(internal_state), gauss_next],
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> Optional['Checkpoint']:
+        """
+        Loads a checkpoint from a JSON file.
+        :param path: the file
+        :return: the checkpoint, or None if the file does not exist
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        version, internal_state, gauss_next = data["random_state"]
+        return Checkpoint(data["seed_terrain"], data["seed_car"], data["settings"], data["generation"], data["score"],
+                          data["generation_scores"], Genome.unpack(base64.b64decode(data["genomes"])),
+                          (version, tuple(internal_state), gauss_next))
@@ -34,4 +34,22 @@ class CustomFormatter(logging.Formatter):
     def format(self, record):
         log_fmt = self.FORMATS.get(record.levelno)
         formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
\ No newline at end of file
+        return formatter.format(record)
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Gives a logger that writes colored messages.
+    Its handler is only added the first time, so that it can be asked for as often as needed.
+    :param name: name of the logger
+    :return: the configured logger
+    """
+    logger = logging.getLogger(name)
+    if not any(isinstance(handler.formatter, CustomFormatter) for handler in logger.handlers):
+        ch = logging.StreamHandler()
+        ch.setLevel(logging.INFO)
+        ch.setFormatter(CustomFormatter())
+        logging.basicConfig(level=logging.INFO)
+        logger.setLevel(logging.INFO)
+        logger.addHandler(ch)
+        logger.propagate = False
+    return logger
@@ -0,0 +1,50 @@
+import json
+from typing import Optional
+
+
+class EventLog:
+    """
+    A class that records the events of the simulation (kills, generation scores...) as JSON lines.
+    Events are buffered in memory and written to the file by batches.
+    Without a file, the log is disabled: callers check `enabled` before building an event,
+    so that recording costs nothing when it is not used.
+    """
+
+    # Default number of events kept in memory before they are written
+    buffer_size = 1000
+
+    def __init__(self, path: Optional[str] = None, buffer_size: int = buffer_size, **context):
+        """
+        Initializes an object of class EventLog.
+        :param path: JSON lines file where the events are appended, None to disable the log
+        :param buffer_size: number of events kept in memory before they are written
+        :param context: fields added to every event, e.g. the game number
+        """
+        self.path = path
+        self.enabled = path is not None
+        self.buffer_size = buffer_size
+        self.context = context
+        self.buffer = []
+
+    def emit(self, event: str, **fields) -> None:
+        """
+        Records an event.
+        :param event: type of the event
+        :param fields: data of the event
+        """
+        record = {"event": event}
+        record.update(self.context)
+        record.update(fields)
+        self.buffer.append(record)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered events to the file.
+        """
+        if not self.buffer:
+            return
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in self.buffer))
+        self.buffer = []
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Optional
+
+
+class FitnessCache:
+    """
+    A class that memoizes the maximum distance reached by cars, with LRU eviction.
+    The physics is deterministic, so a car is identified by its features, the terrain seed and the step budget.
+    Note that Box2D results for a car slightly depend on the other cars simulated in the same world,
+    so a cached distance is the one reached when the car was first simulated, not necessarily the exact one
+    it would reach in another population.
+    """
+
+    # Default maximum number of cached cars
+    max_size = 100000
+
+    def __init__(self, path: Optional[str] = None, max_size: int = max_size):
+        """
+        Initializes an object of class FitnessCache.
+        :param path: optional JSON file where the cache is persisted across runs, loaded if it exists
+        :param max_size: maximum number of cached cars, the least recently used ones are evicted first
+        """
+        self.path = path
+        self.max_size = max_size
+        self.entries = OrderedDict()  # key -> maximum distance, from the least to the most recently used
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None and os.path.exists(self.path):
+            self.load()
+
+    @staticmethod
+    def key(car, seed_terrain: int, max_steps: int, *settings) -> str:
+        """
+        Computes the canonical key of a car.
+        :param car: the Car (or any object with the same features)
+        :param seed_terrain: seed of the terrain the car drives on
+        :param max_steps: step budget of a run
+        :param settings: other simulation settings that change the distance reached by the car, if any
+        :return: a hash of the car features, the terrain seed, the step budget and the settings
+        """
+        features = (
+            tuple(float(radius).hex() for radius in car.wheel_radius),
+            tuple(int(vertex) for vertex in car.wheel_vertex),
+            int(car.motor_wheel_index),
+            tuple((float(vertex[0]).hex(), float(vertex[1]).hex()) for vertex in car.chassis_vertex),
+            int(seed_terrain),
+            int(max_steps),
+        ) + tuple(settings)
+        return hashlib.sha1(repr(features).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[float]:
+        """
+        Gives the cached distance of a car.
+        :param key: key of the car
+        :return: the maximum distance reached by the car, or None if it is not cached
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: float) -> None:
+        """
+        Caches the distance of a car.
+        :param key: key of the car
+        :param value: maximum distance reached by the car
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def load(self) -> None:
+        """
+        Loads the cache from its file.
+        """
+        with open(self.path) as f:
+            self.entries = OrderedDict(json.load(f))
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def merge(self, entries: dict) -> None:
+        """
+        Adds the entries of another cache to this one, e.g. the ones of a game played in a worker process.
+        :param entries: key -> maximum distance, from the least to the most recently used
+        """
+        for key, value in entries.items():
+            self.put(key, value)
+
+    def save(self) -> None:
+        """
+        Saves the cache to its file, if it has one.
+        The file is replaced atomically, so that it is never left half written.
+        The cache is written to a temporary file of its own first, so that two processes saving the same file
+        do not write to the same temporary file.
+        """
+        if self.path is None:
+            return
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(list(self.entries.items()), f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
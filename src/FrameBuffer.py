@@ -0,0 +1,91 @@
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+
+class FrameBuffer:
+    """
+    A ring buffer of frames in shared memory, written by the process of the simulation and read by the process
+    of the renderer (see RenderProcess).
+    The writer never waits: it writes each frame in the next slot, over the oldest one.
+    The reader only takes the latest frame, so that the frames it could not draw in time are dropped.
+    Each slot starts and ends with the number of its frame, so that a frame overwritten while it was read
+    is detected and read again.
+    """
+
+    # Default number of slots
+    slots = 4
+    # Values of a frame before the cars: number of the frame, generation, number of floor tiles,
+    # position of the camera (x, y), distance of the leader, and the 5 best distances (NaN when there are less cars)
+    header_size = 11
+    top_scores = 5
+    # Values of each car: 1 if it is alive, then the (x, y, angle) of its chassis and of its 2 wheels
+    car_size = 10
+
+    def __init__(self, cars: int, name: Optional[str] = None, slots: int = slots):
+        """
+        Initializes an object of class FrameBuffer, creating its shared memory or attaching to an existing one.
+        :param cars: number of cars in a frame
+        :param name: name of the shared memory of an existing FrameBuffer, None to create a new one
+        :param slots: number of frames kept in the buffer
+        """
+        self.cars = cars
+        self.frame_size = FrameBuffer.header_size + cars * FrameBuffer.car_size + 1
+        size = 8 + slots * self.frame_size * 8
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.owner = name is None
+        self.name = self.memory.name
+        self.count = np.ndarray((1,), dtype=np.int64, buffer=self.memory.buf)  # number of frames written
+        self.frames = np.ndarray((slots, self.frame_size), dtype=np.float64, buffer=self.memory.buf, offset=8)
+        if self.owner:
+            self.count[0] = 0
+        self.last_read = 0  # number of frames written when the reader took the last one
+
+    def write(self, generation: int, tiles: int, x: float, y: float, current: float, top_scores: list,
+              cars: np.ndarray) -> None:
+        """
+        Writes the next frame.
+        :param generation: number of the generation of the frame
+        :param tiles: number of floor tiles of the terrain
+        :param x: horizontal position of the camera
+        :param y: vertical position of the camera
+        :param current: distance reached by the leader
+        :param top_scores: best distances reached by the cars, at most 5
+        :param cars: values of each car, as a (cars, car_size) array
+        """
+        number = int(self.count[0])
+        frame = self.frames[number % len(self.frames)]
+        frame[0] = number
+        frame[1:6] = (generation, tiles, x, y, current)
+        frame[6:FrameBuffer.header_size] = np.nan
+        frame[6:6 + len(top_scores)] = top_scores
+        frame[FrameBuffer.header_size:-1] = cars.ravel()
+        frame[-1] = number
+        self.count[0] = number + 1
+
+    def read(self) -> Optional[np.ndarray]:
+        """
+        Takes the latest frame, if it was not taken yet.
+        :return: a copy of the frame, or None if no new frame was written
+        """
+        while True:
+            count = int(self.count[0])
+            if count == self.last_read:
+                return None
+            frame = self.frames[(count - 1) % len(self.frames)].copy()
+            if frame[0] == frame[-1] == count - 1:
+                self.last_read = count
+                return frame
+
+    def close(self) -> None:
+        """
+        Detaches from the shared memory, and frees it if it was created by this FrameBuffer.
+        """
+        del self.count, self.frames
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
@@ -0,0 +1,202 @@
+import sys
+from array import array
+from typing import Iterable, List, Sequence, Tuple
+
+from Box2D import b2Vec2, b2World
+
+
+class Genome:
+    """
+    A class that represents the features of a Car (its genome), without any Box2D object.
+    The features are stored in a fixed-size array of 13 floats:
+    the 2 wheel radiuses, the 2 chassis vertices holding the wheels, the motor wheel index,
+    and the (x, y) coordinates of the 4 chassis vertices.
+    A Genome is hashable, so it must not be modified once used as a key (e.g. in a set).
+    """
+
+    __slots__ = ('values',)
+
+    # Layout of the values
+    number_of_wheels = 2
+    number_of_chassis_vertices = 4
+    wheel_radius_offset = 0
+    wheel_vertex_offset = wheel_radius_offset + number_of_wheels
+    motor_wheel_offset = wheel_vertex_offset + number_of_wheels
+    chassis_vertex_offset = motor_wheel_offset + 1
+    size = chassis_vertex_offset + 2 * number_of_chassis_vertices
+    # Size of a Genome in the binary format (little-endian float64 values)
+    record_size = size * 8
+
+    def __init__(self, wheel_radius: Sequence[float], wheel_vertex: Sequence[int], motor_wheel_index: int,
+                 chassis_vertex: Sequence[Sequence[float]]):
+        """
+        Initializes an object of class Genome, with the same features as the arguments of Car.
+        :param wheel_radius: list of the wheel radiuses
+        :param wheel_vertex: list of the chassis vertices to which the wheels are attached
+        :param motor_wheel_index: index corresponding to the motor wheel
+        :param chassis_vertex: list of the chassis vertices, as b2Vec2 or (x, y) pairs
+        """
+        assert len(wheel_radius) == Genome.number_of_wheels, "A car can only have 2 wheels"
+        assert len(wheel_vertex) == Genome.number_of_wheels, "A car can only have 2 wheels"
+        assert len(chassis_vertex) == Genome.number_of_chassis_vertices, "The car's chassis must have exactly 4 vertices."
+        self.values = array('d', wheel_radius)
+        self.values.extend(wheel_vertex)
+        self.values.append(motor_wheel_index)
+        for vertex in chassis_vertex:
+            self.values.extend((vertex[0], vertex[1]))
+
+    @staticmethod
+    def from_car(car) -> 'Genome':
+        """
+        Gives the genome of a Car.
+        :param car: the Car
+        :return: a new Genome with the features of the Car
+        """
+        return Genome(car.wheel_radius, car.wheel_vertex, car.motor_wheel_index, car.chassis_vertex)
+
+    def create_car(self, world: b2World):
+        """
+        Creates a Car with this genome.
+        :param world: b2World where the Car will be used
+        :return: the newly created Car
+        """
+        from Car import Car
+        return Car(world, self.wheel_radius, self.wheel_vertex, self.motor_wheel_index,
+                   [b2Vec2(x, y) for x, y in self.chassis_vertex])
+
+    @property
+    def wheel_radius(self) -> List[float]:
+        """
+        List of the wheel radiuses.
+        """
+        start = Genome.wheel_radius_offset
+        return self.values[start:start + Genome.number_of_wheels].tolist()
+
+    @wheel_radius.setter
+    def wheel_radius(self, radiuses: Sequence[float]) -> None:
+        start = Genome.wheel_radius_offset
+        self.values[start:start + Genome.number_of_wheels] = array('d', radiuses)
+
+    @property
+    def wheel_vertex(self) -> List[int]:
+        """
+        List of the chassis vertices to which the wheels are attached.
+        """
+        start = Genome.wheel_vertex_offset
+        return [int(vertex) for vertex in self.values[start:start + Genome.number_of_wheels]]
+
+    @wheel_vertex.setter
+    def wheel_vertex(self, vertices: Sequence[int]) -> None:
+        start = Genome.wheel_vertex_offset
+        self.values[start:start + Genome.number_of_wheels] = array('d', vertices)
+
+    @property
+    def motor_wheel_index(self) -> int:
+        """
+        Index corresponding to the motor wheel.
+        """
+        return int(self.values[Genome.motor_wheel_offset])
+
+    @motor_wheel_index.setter
+    def motor_wheel_index(self, index: int) -> None:
+        self.values[Genome.motor_wheel_offset] = index
+
+    @property
+    def chassis_vertex(self) -> List[Tuple[float, float]]:
+        """
+        List of the chassis vertices, as (x, y) pairs.
+        """
+        start = Genome.chassis_vertex_offset
+        coordinates = self.values[start:]
+        return list(zip(coordinates[0::2], coordinates[1::2]))
+
+    @chassis_vertex.setter
+    def chassis_vertex(self, vertices: Sequence[Sequence[float]]) -> None:
+        start = Genome.chassis_vertex_offset
+        self.values[start:] = array('d', [coordinate for vertex in vertices for coordinate in (vertex[0], vertex[1])])
+
+    def copy(self) -> 'Genome':
+        """
+        Gives a copy of this genome, that can be modified without changing this one.
+        """
+        return Genome.from_bytes(self.to_bytes())
+
+    def to_bytes(self) -> bytes:
+        """
+        Gives this genome in the binary format: its 13 values as little-endian float64.
+        """
+        if sys.byteorder == 'little':
+            return self.values.tobytes()
+        values = array('d', self.values)
+        values.byteswap()
+        return values.tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'Genome':
+        """
+        Reads a genome in the binary format.
+        :param data: the bytes of one genome, as given by to_bytes
+        :return: the genome
+        """
+        assert len(data) == Genome.record_size, "A genome is made of {} bytes".format(Genome.record_size)
+        genome = Genome.__new__(Genome)
+        genome.values = array('d')
+        genome.values.frombytes(data)
+        if sys.byteorder != 'little':
+            genome.values.byteswap()
+        return genome
+
+    @staticmethod
+    def pack(genomes: Iterable['Genome']) -> bytes:
+        """
+        Gives a list of genomes (e.g. a whole population) in the binary format: their records one after the other.
+        :param genomes: the genomes
+        :return: the bytes of all the genomes
+        """
+        return b"".join(genome.to_bytes() for genome in genomes)
+
+    @staticmethod
+    def unpack(data: bytes) -> List['Genome']:
+        """
+        Reads a list of genomes in the binary format.
+        :param data: the bytes of the genomes, as given by pack
+        :return: the genomes, in order
+        """
+        assert len(data) % Genome.record_size == 0, "The data does not contain a whole number of genomes"
+        size = Genome.record_size
+        return [Genome.from_bytes(data[i:i + size]) for i in range(0, len(data), size)]
+
+    @staticmethod
+    def save(path: str, genomes: Iterable['Genome']) -> None:
+        """
+        Writes a list of genomes to a binary file.
+        :param path: the file
+        :param genomes: the genomes
+        """
+        with open(path, "wb") as f:
+            f.write(Genome.pack(genomes))
+
+    @staticmethod
+    def load(path: str) -> List['Genome']:
+        """
+        Reads a list of genomes from a binary file written by save.
+        :param path: the file
+        :return: the genomes, in order
+        """
+        with open(path, "rb") as f:
+            return Genome.unpack(f.read())
+
+    def __reduce__(self):
+        # Pickled as its bytes, which is much cheaper than a list of b2Vec2
+        return Genome.from_bytes, (self.to_bytes(),)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Genome) and self.values == other.values
+
+    def __hash__(self) -> int:
+        # Hashed by value like __eq__ compares, so that -0.0 and 0.0 give the same hash
+        return hash(tuple(value + 0.0 for value in self.values))
+
+    def __repr__(self) -> str:
+        return "Genome({}, {}, {}, {})".format(self.wheel_radius, self.wheel_vertex, self.motor_wheel_index,
+                                               self.chassis_vertex)
@@ -0,0 +1,52 @@
+import numpy as np
+from typing import List, Optional
+
+
+class Leaderboard:
+    """
+    A class that tells which Cars of a PopulationState are in the lead.
+    Its answers are kept until the state changes (a Car moves or dies), and are only computed again
+    when they are asked for: a simulation without display never pays for them.
+    """
+
+    def __init__(self, state):
+        """
+        Initializes an object of class Leaderboard.
+        :param state: the PopulationState of the Cars
+        """
+        self.state = state
+        self.leader_version = -1  # version of the state for which the leader was computed
+        self.leader_index = None
+        self.top_version = -1  # version of the state for which the top scores were computed
+        self.top = np.zeros(0)
+
+    def leader(self) -> Optional[int]:
+        """
+        Gives the living Car that went the furthest, the last one in population order in case of a tie.
+        :return: its index, or None if all the Cars are dead
+        """
+        state = self.state
+        if self.leader_version != state.version:
+            alive = np.flatnonzero(~state.dead)
+            if len(alive) == 0:
+                self.leader_index = None
+            else:
+                distances = state.max_dist[alive]
+                self.leader_index = int(alive[len(alive) - 1 - np.argmax(distances[::-1])])
+            self.leader_version = state.version
+        return self.leader_index
+
+    def top_scores(self, k: int) -> List[float]:
+        """
+        Gives the k best distances reached by the Cars, dead or alive.
+        :param k: number of distances
+        :return: the distances, from the best one
+        """
+        state = self.state
+        if self.top_version != state.version or len(self.top) < min(k, len(state.max_dist)):
+            distances = state.max_dist
+            if k < len(distances):
+                distances = np.partition(distances, len(distances) - k)[len(distances) - k:]
+            self.top = np.sort(distances)[::-1]
+            self.top_version = state.version
+        return [float(distance) for distance in self.top[:k]]
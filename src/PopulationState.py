@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+from typing import Callable, List, Optional
+
+
+class StateField:
+    """
+    A Car attribute that is stored in the arrays of a PopulationState while the Car is bound to one,
+    and in the Car itself otherwise.
+    """
+
+    def __init__(self, array_name: str, convert: Callable):
+        """
+        Initializes an object of class StateField.
+        :param array_name: name of the PopulationState array holding the attribute
+        :param convert: function converting an array element to the attribute type
+        """
+        self.array_name = array_name
+        self.convert = convert
+
+    def __set_name__(self, owner, name: str):
+        self.name = '_' + name
+
+    def __get__(self, car, owner=None):
+        if car is None:
+            return self
+        if car.state is None:
+            return car.__dict__[self.name]
+        return self.convert(getattr(car.state, self.array_name)[car.index])
+
+    def __set__(self, car, value) -> None:
+        if car.state is None:
+            car.__dict__[self.name] = value
+        else:
+            getattr(car.state, self.array_name)[car.index] = value
+            car.state.version += 1
+
+
+class PopulationState:
+    """
+    A class that holds the state of a population of Cars (positions, velocities, health, distances...)
+    in NumPy arrays, so that it is updated in one batched pass per physics step.
+    The Cars of the population are bound to it, and their attributes are views onto its arrays.
+    """
+
+    # Health lost by a Car at each update where it does not move forward
+    health_decrement = 2
+
+    def __init__(self, population: List, start_x: float, health_decrement: int = health_decrement):
+        """
+        Initializes an object of class PopulationState, and binds the Cars to it.
+        :param population: the Cars of the population
+        :param start_x: horizontal start position of the Cars, from which their distance is computed
+        :param health_decrement: health lost by a Car at each update where it does not move forward
+        """
+        size = len(population)
+        self.start_x = start_x
+        self.health_decrement = health_decrement
+        self.version = 0  # incremented each time the state changes
+        self.bodies = [car.chassis.body for car in population]
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.linear_vel = np.zeros(size)
+        self.health = np.zeros(size, dtype=np.int64)
+        self.dead = np.zeros(size, dtype=bool)
+        self.max_dist = np.zeros(size)
+        self.stagnation_dist = np.zeros(size)
+        self.stagnation_step = np.zeros(size, dtype=np.int64)
+        for index, car in enumerate(population):
+            car.bind(self, index)
+
+    def update(self, step: int, stagnation_steps: Optional[int] = None, stagnation_epsilon: float = 0.0) -> np.ndarray:
+        """
+        Updates the state of the living Cars from their chassis, as Car.set_pos_and_vel does for one Car.
+        The Cars that did not move for stagnation_steps are killed too, this rule is only implemented here.
+        :param step: current step of the run
+        :param stagnation_steps: optional number of steps after which a Car that did not move is killed
+        :param stagnation_epsilon: distance under which a Car is considered as not moving
+        :return: the indices of the Cars that died during this update, in increasing order
+        """
+        alive = np.flatnonzero(~self.dead)
+        if len(alive) == 0:
+            return alive
+        self.version += 1
+        bodies = self.bodies
+        data = []
+        for i in alive:
+            body = bodies[i]
+            position = body.position
+            data.append((position.x, position.y, body.linearVelocity.x))
+        x, y, linear_vel = np.array(data).T
+        self.x[alive] = x
+        self.y[alive] = y
+        self.linear_vel[alive] = linear_vel
+
+        # Health decreases when the car does not move forward
+        slow = alive[linear_vel < 0.0001]
+        self.health[slow] -= self.health_decrement
+        dying = slow[self.health[slow] <= 0]
+        self.health[dying] = 0
+        self.dead[dying] = True
+
+        self.max_dist[alive] = x - self.start_x
+
+        if stagnation_steps is not None:
+            living = alive[~self.dead[alive]]
+            moved = np.abs(self.max_dist[living] - self.stagnation_dist[living]) > stagnation_epsilon
+            self.stagnation_dist[living[moved]] = self.max_dist[living[moved]]
+            self.stagnation_step[living[moved]] = step
+            still = living[~moved]
+            stuck = still[step - self.stagnation_step[still] >= stagnation_steps]
+            self.health[stuck] = 0
+            self.dead[stuck] = True
+            dying = np.union1d(dying, stuck)
+        return dying
+
+    def cut(self, keep: float) -> np.ndarray:
+        """
+        Kills the living Cars that are not in the given top fraction of the living Cars, by distance.
+        Their distance is kept as it is.
+        :param keep: fraction of the living Cars that stay alive, rounded up
+        :return: the indices of the Cars that died, in increasing order
+        """
+        alive = np.flatnonzero(~self.dead)
+        kept = math.ceil(len(alive) * keep)
+        # Ties are broken in favor of the first Cars, for reproducibility
+        ranking = alive[np.argsort(-self.max_dist[alive], kind="stable")]
+        dying = np.sort(ranking[kept:])
+        self.health[dying] = 0
+        self.dead[dying] = True
+        self.version += 1
+        return dying
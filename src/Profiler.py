@@ -0,0 +1,158 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+
+class Phase:
+    """
+    A context manager that adds the time spent in its block to a phase of a Profiler.
+    """
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class Profiler:
+    """
+    A class that measures where the time of the games goes: the time spent in each phase
+    (physics steps, car updates, drawing, creation of the generations...), in total and per generation,
+    with the number of steps, bodies and contacts of each generation.
+    When it is disabled, phase() gives a context manager that does nothing, so that profiling costs
+    almost nothing when it is not used, and callers check `enabled` before counting anything else.
+    """
+
+    # Shared by all the disabled profilers
+    disabled_phase = nullcontext()
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initializes an object of class Profiler.
+        :param enabled: whether the measures are taken
+        """
+        self.enabled = enabled
+        self.games = 0
+        self.totals = defaultdict(float)  # phase -> time spent in it (in seconds)
+        self.calls = defaultdict(int)  # phase -> number of times it was timed
+        self.generations = []  # measures of each generation, in order
+        self.generation = None  # measures of the current generation
+
+    def phase(self, name: str):
+        """
+        Gives a context manager timing its block as a part of a phase.
+        :param name: name of the phase
+        """
+        if not self.enabled:
+            return Profiler.disabled_phase
+        return Phase(self, name)
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        Adds time to a phase.
+        :param name: name of the phase
+        :param seconds: time spent in the phase
+        """
+        self.totals[name] += seconds
+        self.calls[name] += 1
+        if self.generation is not None:
+            phases = self.generation["phases"]
+            phases[name] = phases.get(name, 0.0) + seconds
+
+    def start_game(self) -> None:
+        """
+        Starts the measures of a new game.
+        """
+        self.games += 1
+
+    def start_generation(self, generation: int, bodies: int) -> None:
+        """
+        Starts the measures of a generation.
+        :param generation: number of the generation in its game, from 1
+        :param bodies: number of bodies in the world at the start of the generation
+        """
+        self.generation = {"game": self.games, "generation": generation, "bodies": bodies, "steps": 0,
+                           "contacts": 0, "max_contacts": 0, "phases": {}, "start": time.perf_counter()}
+
+    def count_step(self, contacts: int) -> None:
+        """
+        Counts a physics step of the current generation.
+        :param contacts: number of contacts in the world after the step
+        """
+        generation = self.generation
+        generation["steps"] += 1
+        generation["contacts"] += contacts
+        if contacts > generation["max_contacts"]:
+            generation["max_contacts"] = contacts
+
+    def end_generation(self) -> None:
+        """
+        Ends the measures of the current generation.
+        """
+        generation = self.generation
+        generation["time"] = time.perf_counter() - generation.pop("start")
+        self.generations.append(generation)
+        self.generation = None
+
+    def merge(self, other: 'Profiler') -> None:
+        """
+        Adds the measures of another Profiler, e.g. the one of a game played in another process.
+        :param other: the other Profiler, whose games come after the ones of this Profiler
+        """
+        for name, seconds in other.totals.items():
+            self.totals[name] += seconds
+            self.calls[name] += other.calls[name]
+        for generation in other.generations:
+            generation = dict(generation, game=generation["game"] + self.games)
+            self.generations.append(generation)
+        self.games += other.games
+
+    def to_dict(self) -> dict:
+        """
+        Gives the measures as a dictionary, that can be written in JSON.
+        """
+        return {
+            "games": self.games,
+            "phases": {name: {"time": seconds, "calls": self.calls[name]} for name, seconds in self.totals.items()},
+            "generations": self.generations,
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Writes the measures to a JSON file.
+        :param path: the file
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self) -> str:
+        """
+        Gives the measures as a text table: the time of each phase, then the counts of each generation.
+        """
+        total = sum(self.totals.values())
+        steps = sum(generation["steps"] for generation in self.generations)
+        lines = ["{:<16}{:>12}{:>8}{:>10}{:>14}".format("Phase", "Time (s)", "Share", "Calls", "Per call (us)")]
+        for name, seconds in sorted(self.totals.items(), key=lambda item: -item[1]):
+            calls = self.calls[name]
+            lines.append("{:<16}{:>12.3f}{:>7.1f}%{:>10}{:>14.1f}".format(
+                name, seconds, 100 * seconds / total if total else 0.0, calls, 1e6 * seconds / calls))
+        step_time = self.totals.get("step", 0.0)
+        lines.append("{} games, {} generations, {} physics steps ({:.0f} steps/s in world.Step)".format(
+            self.games, len(self.generations), steps, steps / step_time if step_time else 0.0))
+        lines.append("")
+        lines.append("{:>4}{:>11}{:>8}{:>10}{:>8}{:>14}{:>14}".format(
+            "Game", "Generation", "Steps", "Time (s)", "Bodies", "Mean contacts", "Max contacts"))
+        for generation in self.generations:
+            lines.append("{:>4}{:>11}{:>8}{:>10.3f}{:>8}{:>14.1f}{:>14}".format(
+                generation["game"], generation["generation"], generation["steps"], generation["time"],
+                generation["bodies"], generation["contacts"] / generation["steps"] if generation["steps"] else 0.0,
+                generation["max_contacts"]))
+        return "\n".join(lines)
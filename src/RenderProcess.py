@@ -0,0 +1,163 @@
+import sys
+import time
+from itertools import islice
+from multiprocessing import Event, Process, Queue, resource_tracker
+from queue import Empty
+
+import numpy as np
+import pygame
+
+from FrameBuffer import FrameBuffer
+from Renderer import Renderer, TARGET_FPS
+from Terrain import Terrain
+
+
+class RenderProcess:
+    """
+    A class that draws a Simulation in another process, so that the simulation does not wait for the display.
+    It is attached to the simulation as an observer, like a Renderer: at most TARGET_FPS times per second,
+    it writes the positions of the bodies to a FrameBuffer in shared memory, and the other process draws
+    the latest frame with a Renderer, dropping the ones it had no time to draw.
+    The cars and the terrain of each generation are sent to the other process once, through a queue.
+    The simulation never waits for the display, so there is no speed to choose as with a Renderer.
+    """
+
+    def __init__(self, render_every: int = 1, render_final: bool = False):
+        """
+        Initializes an object of class RenderProcess, and starts the process that opens the game window.
+        :param render_every: only the generations whose number is a multiple of render_every are drawn
+        :param render_final: if True, only the last generation is drawn
+        """
+        self.queue = Queue()
+        self.closed = Event()  # set by the other process when the window is closed
+        # The other process must share the resource tracker of this one: with its own tracker, the shared memories
+        # it attached to would be freed when it stops
+        resource_tracker.ensure_running()
+        self.process = Process(target=RenderProcess.render, args=(self.queue, self.closed), daemon=True)
+        self.process.start()
+        self.buffer = None  # FrameBuffer of the current generation
+        self.population = None  # population of the current generation
+        self.generation = 0  # number of generations sent to the other process
+        self.last_frame = -float("inf")  # time of the last frame written
+        self.render_every = render_every
+        self.render_final = render_final
+        self.drawn = True  # True if the current generation is drawn
+
+    def on_step(self, simulation) -> None:
+        """
+        Writes the state of the simulation to the FrameBuffer, if the other process may draw a new frame.
+        :param simulation: the Simulation to draw
+        """
+        if self.closed.is_set():
+            # The user closed the window or pressed escape
+            sys.exit()  # quit the game
+        if simulation.population is not self.population:
+            self.start_generation(simulation)
+        if not self.drawn:
+            return
+        now = time.perf_counter()
+        if now - self.last_frame < 1 / TARGET_FPS:
+            return
+        self.last_frame = now
+        leader = simulation.leader
+        center = leader.chassis.body.worldCenter
+        cars = np.zeros((len(self.population), FrameBuffer.car_size))
+        for i, car in enumerate(self.population):
+            if not car.isDead:
+                cars[i, 0] = 1
+                cars[i, 1:] = np.ravel(Renderer.car_transforms(car))
+        self.buffer.write(self.generation, len(simulation.floor.tiles()), center.x, center.y, leader.max_dist,
+                          simulation.leaderboard.top_scores(FrameBuffer.top_scores), cars)
+
+    def start_generation(self, simulation) -> None:
+        """
+        Sends the cars and the terrain of a new generation to the other process, with a new FrameBuffer.
+        :param simulation: the Simulation
+        """
+        previous = self.buffer
+        self.population = simulation.population
+        self.buffer = FrameBuffer(len(self.population))
+        self.generation += 1
+        self.drawn = Renderer.draws_generation(simulation.generation, self.render_every, self.render_final)
+        cars = [([tuple(vertex) for vertex in car.chassis_vertex], list(car.wheel_radius)) for car in self.population]
+        self.queue.put((self.generation, self.buffer.name, cars, simulation.seed_terrain, simulation.floor_tiles))
+        self.last_frame = -float("inf")
+        if previous is not None:
+            previous.close()
+
+    def close(self) -> None:
+        """
+        Stops the other process once it drew the last frame, and frees the FrameBuffer.
+        """
+        self.queue.put(None)
+        self.process.join()
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+    @staticmethod
+    def render(queue: Queue, closed: Event) -> None:
+        """
+        Draws the frames of the FrameBuffers sent through a queue, until None is sent or the window is closed.
+        It runs in the other process.
+        :param queue: the queue of the generations, as (number, name of the FrameBuffer, cars, seed of the terrain,
+        floor tiles), where the cars are given as (chassis vertices, wheel radiuses)
+        :param closed: event set when the window is closed
+        """
+        try:
+            renderer = Renderer()
+            buffer = None
+            cars = []
+            terrain = None
+            tiles = []  # floor tiles generated so far, as given by Terrain.generate_tiles
+            tile_generator = None
+            while True:
+                renderer.check_events()
+                message = RenderProcess.latest_message(queue)
+                if message is None:
+                    break  # the game is over
+                if message:
+                    _, name, cars, seed_terrain, floor_tiles = message
+                    if buffer is not None:
+                        buffer.close()
+                    try:
+                        buffer = FrameBuffer(len(cars), name)
+                    except FileNotFoundError:
+                        buffer = None  # the generation is already over
+                    if terrain != (seed_terrain, floor_tiles):
+                        terrain = (seed_terrain, floor_tiles)
+                        tiles = []
+                        tile_generator = Terrain.generate_tiles(seed_terrain, floor_tiles)
+                frame = None if buffer is None else buffer.read()
+                if frame is not None:
+                    tile_count = int(frame[2])
+                    if tile_count > len(tiles):
+                        tiles.extend(islice(tile_generator, tile_count - len(tiles)))
+                    values = frame[FrameBuffer.header_size:-1].reshape(-1, FrameBuffer.car_size)
+                    frame_cars = [(chassis_vertex, wheel_radius, values[i, 1:].reshape(3, 3).tolist())
+                                  for i, (chassis_vertex, wheel_radius) in enumerate(cars) if values[i, 0]]
+                    top_scores = [float(score) for score in frame[6:FrameBuffer.header_size] if not np.isnan(score)]
+                    renderer.draw_frame(frame[3], frame[4], tiles, frame_cars, frame[5], top_scores)
+                    pygame.display.flip()
+                renderer.clock.tick(TARGET_FPS)
+            if buffer is not None:
+                buffer.close()
+        finally:
+            closed.set()
+
+    @staticmethod
+    def latest_message(queue: Queue):
+        """
+        Takes the messages of the queue, and keeps the latest one: the generations that are already over are skipped.
+        :param queue: the queue of the generations
+        :return: the latest message, None if the game is over, or False if there is no message
+        """
+        message = False
+        while True:
+            try:
+                received = queue.get_nowait()
+            except Empty:
+                return message
+            if received is None:
+                return None
+            message = received
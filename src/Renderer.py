@@ -0,0 +1,409 @@
+import math
+import sys
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import pygame
+from pygame.locals import *
+
+from Box2D.b2 import *
+from Box2D import *
+
+from Simulation import NUMBER_OF_GENERATIONS
+
+# colors for the game
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GRAY = (125, 125, 125)
+BACKGROUND = (90, 23, 100, 100)
+GRASS = (160, 96, 69, 255)
+TERRAIN = (189, 123, 95, 255)
+WHEELS_OUTER = (38, 192, 90)  # outer color for the wheels
+WHEELS_INNER = (255, 0, 0)
+DEAD = (125, 125, 125)
+colors = {
+    b2_staticBody:  GRASS,  # terrain
+    b2_dynamicBody: (127, 127, 127, 255)   # car chassis
+}
+
+# Display parameters
+PPM = 30.0  # pixels per meter
+TARGET_FPS = 60
+SCREEN_WIDTH, SCREEN_HEIGHT = 640, 480
+# Speeds of the game, in physics steps per frame (None to draw at most TARGET_FPS frames per second of wall time,
+# without waiting), and the keys that select them
+SPEEDS = (1, 4, 16, None)
+SPEED_KEYS = {K_1: 1, K_2: 4, K_3: 16, K_4: None}
+# Camera: screen position of the leader, and maximum vertical offset when it goes up or down
+CAMERA_X = 350
+CAMERA_Y = -200
+MAX_Y_OFFSET = 300
+
+# Render caches
+# Number of floor tiles drawn together on a cached terrain surface
+TILES_PER_CHUNK = 16
+# Maximum number of cached terrain surfaces, the least recently used ones are drawn again when needed
+MAX_CHUNKS = 8
+# Number of cached orientations of a wheel
+WHEEL_ANGLES = 64
+# Maximum number of cached wheel sprites
+MAX_WHEEL_SPRITES = 4096
+# Color of the transparent pixels of the cached surfaces
+TRANSPARENT = (255, 0, 255)
+# Bodies further than this distance from the screen (in pixels) are not drawn
+VIEW_MARGIN = 2 * PPM
+
+
+class Renderer:
+    """
+    A class that draws a Simulation with pygame.
+    It is attached to the simulation as an observer, and is only created when the game is drawn.
+    The terrain never moves: it is drawn once on cached surfaces, one per chunk of floor tiles,
+    which are then only blitted with the camera offset. The wheels are blitted from cached sprites.
+    Only the chunks and the bodies in the viewport are drawn.
+    The speed of the game is the number of physics steps per frame drawn, set with the keys 1 to 4 (1x, 4x, 16x,
+    or the maximum speed). The generations that are not drawn are simulated at the maximum speed.
+    The physics does not depend on what is drawn, so the scores do not depend on the speed.
+    """
+
+    def __init__(self, speed: Optional[int] = 1, render_every: int = 1, render_final: bool = False):
+        """
+        Initializes an object of class Renderer, and opens the game window.
+        :param speed: number of physics steps per frame drawn, None for the maximum speed
+        :param render_every: only the generations whose number is a multiple of render_every are drawn
+        :param render_final: if True, only the last generation is drawn
+        """
+        pygame.init()
+
+        self.font_top = pygame.font.SysFont('Comic Sans MS', 16)  # used for the top 2..n cars i the end display
+        self.scores_width, self.border = self.font_top.size("Top 5: 9999.9 m")  # where the scores will be written
+        self.init_score_width, _ = self.font_top.size("Current: 9999.9 m ")  # where the scores will be written
+
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT + self.border), 0, 32)
+        self.speed = None
+        self.set_speed(speed)
+        self.render_every = render_every
+        self.render_final = render_final
+        self.generation = None  # generation of the last step
+        self.drawn = True  # True if the generation of the last step is drawn
+        self.last_frame = -float("inf")  # time of the last frame drawn
+        self.clock = pygame.time.Clock()
+        self.bg = pygame.image.load("../asset/background.png").convert()
+        self.leader = None
+        self.camera = (0.0, 0.0)  # screen position of the world origin, set at each frame
+
+        self.tiles = []  # floor tiles of the terrain drawn, as given by Terrain.tiles()
+        self.chunks = OrderedDict()  # chunk index -> (left x in meters, number of tiles drawn, surface)
+        self.wheel_sprites = {}  # (radius, angle index) -> sprite
+        self.texts = {}  # text -> rendered text
+
+    def on_step(self, simulation) -> None:
+        """
+        Draws the world of the simulation before a physics step, if a frame is drawn at this step:
+        every `speed` steps, or at most TARGET_FPS times per second at the maximum speed.
+        :param simulation: the Simulation to draw
+        """
+        if simulation.generation != self.generation:
+            self.generation = simulation.generation
+            self.drawn = Renderer.draws_generation(simulation.generation, self.render_every, self.render_final)
+        if self.drawn and self.speed is not None:
+            if simulation.steps % self.speed:
+                return
+        else:
+            now = time.perf_counter()
+            if now - self.last_frame < 1 / TARGET_FPS:
+                return
+            self.last_frame = now
+        for event in self.check_events():
+            if event.type == KEYDOWN and event.key in SPEED_KEYS:
+                self.set_speed(SPEED_KEYS[event.key])
+        self.leader = simulation.leader
+        top_scores = simulation.leaderboard.top_scores(5)
+        if self.drawn:
+            center = self.leader.chassis.body.worldCenter
+            cars = [(car.chassis_vertex, car.wheel_radius, Renderer.car_transforms(car))
+                    for car in simulation.population if not car.isDead]
+            self.draw_frame(center.x, center.y, simulation.floor.tiles(), cars, self.leader.max_dist, top_scores)
+        else:
+            self.screen.blit(self.bg, (0, 0))
+            description = "Generation n°{} is not drawn".format(simulation.generation + 1)
+            self.screen.blit(self.text(description), (self.border, self.border))
+            self.draw_top_scores(self.leader.max_dist, top_scores)
+
+        # Flip the screen and try to keep at the target FPS
+        pygame.display.flip()
+        if self.drawn and self.speed is not None:
+            self.clock.tick(TARGET_FPS)
+
+    def set_speed(self, speed: Optional[int]) -> None:
+        """
+        Sets the speed of the game, shown in the title of the window.
+        :param speed: number of physics steps per frame drawn, None for the maximum speed
+        """
+        assert speed in SPEEDS, "The speed must be one of {}".format(SPEEDS)
+        self.speed = speed
+        if speed == 1:
+            pygame.display.set_caption('INGI-Dakar 2k21')
+        else:
+            pygame.display.set_caption('INGI-Dakar 2k21 - speed {}'.format("max" if speed is None else f"{speed}x"))
+
+    @staticmethod
+    def draws_generation(generation: int, render_every: int, render_final: bool) -> bool:
+        """
+        Tells if a generation is drawn.
+        :param generation: the generation, from 0
+        :param render_every: only the generations whose number is a multiple of render_every are drawn
+        :param render_final: if True, only the last generation is drawn
+        """
+        if render_final:
+            return generation + 1 == NUMBER_OF_GENERATIONS
+        return (generation + 1) % render_every == 0
+
+    def check_events(self) -> list:
+        """
+        Checks the event queue, and quits the game if the window is closed or escape is pressed.
+        :return: the other events
+        """
+        events = []
+        for event in pygame.event.get():
+            if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                # The user closed the window or pressed escape
+                sys.exit()  # quit the game
+            events.append(event)
+        return events
+
+    @staticmethod
+    def car_transforms(car) -> list:
+        """
+        Gives the position and the angle of the bodies of a Car: its chassis, then its wheels.
+        """
+        return [(body.position.x, body.position.y, body.angle)
+                for body in [car.chassis.body] + [wheel.body for wheel in car.wheels]]
+
+    def draw_frame(self, x: float, y: float, tiles: list, cars: list, current: float, top_scores: list) -> None:
+        """
+        Draws a frame of a game, without showing it: the terrain, the cars and the scores.
+        It only needs the positions of the bodies, so that a recorded game can be drawn as well.
+        :param x: horizontal position of the center of the chassis of the leader, followed by the camera
+        :param y: vertical position of the center of the chassis of the leader
+        :param tiles: the floor tiles of the terrain, as given by Terrain.tiles()
+        :param cars: the cars to draw, as (chassis vertices, wheel radiuses, transforms), where the transforms are
+        the (x, y, angle) of the chassis and of the wheels
+        :param current: distance reached by the leader
+        :param top_scores: best distances reached by the cars of the generation
+        """
+        self.camera = self.camera_position(x, y)
+        # screen.fill(BACKGROUND)
+        self.screen.blit(self.bg, (0, 0))
+        # 229,153,153,255
+        # Draw the world
+        self.draw_terrain(tiles)
+        # The cars are drawn in the order of the bodies of the world: each chassis, then its wheels
+        for chassis_vertex, wheel_radius, transforms in cars:
+            if not self.is_visible(transforms[0][0], transforms[0][1]):
+                continue
+            self.draw_polygon(chassis_vertex, *transforms[0])
+            for radius, (wheel_x, wheel_y, wheel_angle) in zip(wheel_radius, transforms[1:]):
+                self.draw_circle(radius, wheel_x, wheel_y, wheel_angle)
+        # draw the scores
+        self.draw_top_scores(current, top_scores)
+
+    @staticmethod
+    def camera_y_offset(y: float) -> float:
+        """
+        Computes the vertical offset of the camera, which follows the leader.
+        :param y: vertical position of the center of the chassis of the leader
+        """
+        y_offset = y * 70
+        if y_offset < -MAX_Y_OFFSET:
+            y_offset = -MAX_Y_OFFSET
+        if y_offset > MAX_Y_OFFSET:
+            y_offset = MAX_Y_OFFSET
+        return y_offset
+
+    @staticmethod
+    def camera_position(x: float, y: float) -> tuple:
+        """
+        Computes the position of the world origin on the screen, with the camera following the leader.
+        A point (x, y) of the world is drawn at (x * PPM + camera[0], camera[1] - y * PPM).
+        :param x: horizontal position of the center of the chassis of the leader
+        :param y: vertical position of the center of the chassis of the leader
+        """
+        return CAMERA_X - x * PPM, SCREEN_HEIGHT + Renderer.camera_y_offset(y) * 0.5 + CAMERA_Y
+
+    def is_visible(self, x: float, y: float) -> bool:
+        """
+        Tells whether a body at a position is close enough to the viewport to be drawn.
+        """
+        x = x * PPM + self.camera[0]
+        y = self.camera[1] - y * PPM
+        return -VIEW_MARGIN < x < SCREEN_WIDTH + VIEW_MARGIN and -VIEW_MARGIN < y < SCREEN_HEIGHT + VIEW_MARGIN
+
+    def draw_circle(self, radius: float, x: float, y: float, angle: float) -> None:
+        """
+        Draws a wheel.
+        :param radius: radius of the wheel
+        :param x: horizontal position of the center of the wheel
+        :param y: vertical position of the center of the wheel
+        :param angle: angle of the wheel
+        """
+        position = (x * PPM + self.camera[0], self.camera[1] - y * PPM)
+        pixels = int(radius * PPM)
+        self.screen.blit(self.wheel_sprite(radius, angle), (position[0] - pixels, position[1] - pixels))
+
+    def wheel_sprite(self, radius: float, angle: float) -> pygame.Surface:
+        """
+        Gives the sprite of a wheel, drawn once per radius and orientation.
+        :param radius: radius of the wheel, in meters
+        :param angle: angle of the wheel, in radians, rounded to one of the WHEEL_ANGLES cached orientations
+        """
+        index = round(angle / (2 * math.pi) * WHEEL_ANGLES) % WHEEL_ANGLES
+        sprite = self.wheel_sprites.get((radius, index))
+        if sprite is None:
+            if len(self.wheel_sprites) >= MAX_WHEEL_SPRITES:
+                self.wheel_sprites.clear()
+            center_s = [int(radius * PPM),
+                        int(radius * PPM)]  # this is for drawing on the new surface we create below
+            # 0,0 is top left corner, so to draw a circle on the top
+            # left corner, we set center as radius,radius
+
+            sprite = pygame.Surface(
+                (50, 50))  # create a surface just enough for the wheel radius , too big will cause the sim. to lag
+            sprite.set_alpha(100)  # transparancy value
+            sprite.fill(WHITE)  # fill the screen
+            sprite.set_colorkey(WHITE)  # comment this to see how screen blit works
+
+            pygame.draw.circle(sprite, WHEELS_OUTER, center_s, int(radius * PPM), 0)
+
+            axis = b2Mul(b2Rot(index * 2 * math.pi / WHEEL_ANGLES), b2Vec2(10.0, 25.0))
+            pygame.draw.aaline(sprite, WHEELS_INNER, center_s,
+                               (center_s[0] - radius * axis[0], center_s[1] + radius * axis[1]))
+            self.wheel_sprites[(radius, index)] = sprite
+        return sprite
+
+    def draw_polygon(self, chassis_vertex: list, x: float, y: float, angle: float) -> None:
+        """
+        Draws the chassis of a car, as the triangles of its fixtures.
+        :param chassis_vertex: the vertices of the chassis
+        :param x: horizontal position of the chassis
+        :param y: vertical position of the chassis
+        :param angle: angle of the chassis
+        """
+        c, s = math.cos(angle), math.sin(angle)
+        points = [(x * PPM + self.camera[0] + (c * v[0] - s * v[1]) * PPM,
+                   self.camera[1] - y * PPM - (s * v[0] + c * v[1]) * PPM) for v in chassis_vertex]
+        origin = (x * PPM + self.camera[0], self.camera[1] - y * PPM)
+        for i in range(len(points)):
+            pygame.draw.polygon(self.screen, colors[b2_dynamicBody], [points[i], points[(i + 1) % len(points)], origin])
+
+    @staticmethod
+    def terrain_area(vertices: list, bottom: float) -> list:
+        """
+        Gives the area under a floor tile, down to the bottom of the surface where it is drawn.
+        :param vertices: vertices of the floor tile on the surface
+        :param bottom: vertical position of the bottom of the surface
+        :return: the vertices of the area
+        """
+        inf = float("inf")
+        minX = inf
+        maxX = -inf
+        left_bot = (inf, -inf)
+        right_bot = (-inf, -inf)
+        for vert in vertices:
+            x, y = vert[0], vert[1]
+            if minX >= x:
+                minX = x
+                left_bot = (x, y) if y > left_bot[1] or left_bot[0] > x else left_bot
+            if maxX <= x:
+                maxX = x
+                right_bot = (x, y) if y > right_bot[1] or right_bot[0] < x else right_bot
+        return [left_bot, (minX, bottom), (maxX, bottom), right_bot]
+
+    def draw_terrain(self, tiles: list) -> None:
+        """
+        Draws the chunks of the terrain that are in the viewport, from the cache.
+        :param tiles: the floor tiles of the terrain, as given by Terrain.tiles()
+        """
+        if tiles is not self.tiles:
+            # Another terrain
+            self.tiles = tiles
+            self.chunks.clear()
+        # The camera cannot go above or below a band of the world, the cached surfaces cover this band
+        top = (SCREEN_HEIGHT + CAMERA_Y + MAX_Y_OFFSET * 0.5) / PPM
+        left = -self.camera[0] / PPM
+        right = (SCREEN_WIDTH - self.camera[0]) / PPM
+        for index in range(0, (len(tiles) + TILES_PER_CHUNK - 1) // TILES_PER_CHUNK):
+            count = len(tiles) - index * TILES_PER_CHUNK
+            if count > TILES_PER_CHUNK:
+                count = TILES_PER_CHUNK
+            first = tiles[index * TILES_PER_CHUNK]
+            last = tiles[index * TILES_PER_CHUNK + count - 1]
+            # Tiles are less than 2 meters wide
+            if last[0] + 2 < left:
+                continue
+            if first[0] - 2 > right:
+                break
+            chunk = self.chunks.get(index)
+            if chunk is None or chunk[1] != count:
+                chunk = self.draw_chunk(index, top)
+            self.chunks.move_to_end(index)
+            self.screen.blit(chunk[2], (chunk[0] * PPM + self.camera[0], self.camera[1] - top * PPM))
+
+    def draw_chunk(self, index: int, top: float) -> tuple:
+        """
+        Draws a chunk of the terrain on a new cached surface.
+        :param index: index of the chunk, made of the floor tiles index * TILES_PER_CHUNK and the next ones
+        :param top: vertical position (in meters) of the top of the surface
+        :return: the cached chunk
+        """
+        tiles = self.tiles[index * TILES_PER_CHUNK:(index + 1) * TILES_PER_CHUNK]
+        polygons = [[(tile[0] + tile[i], tile[1] + tile[i + 1]) for i in range(2, len(tile), 2)] for tile in tiles]
+        xs = sorted(x for polygon in polygons for x, _ in polygon)  # min and max are the ones of Box2D here
+        left = xs[0] - 1 / PPM
+        right = xs[-1] + 1 / PPM
+        height = SCREEN_HEIGHT + MAX_Y_OFFSET
+        surface = pygame.Surface((int(math.ceil((right - left) * PPM)) + 1, height)).convert()
+        surface.fill(TRANSPARENT)
+        surface.set_colorkey(TRANSPARENT, RLEACCEL)
+        for polygon in polygons:
+            vertices = [((x - left) * PPM, (top - y) * PPM) for x, y in polygon]
+            pygame.draw.polygon(surface, TERRAIN, Renderer.terrain_area(vertices, height))
+            pygame.draw.polygon(surface, colors[b2_staticBody], vertices)
+        chunk = (left, len(tiles), surface)
+        self.chunks[index] = chunk
+        while len(self.chunks) > MAX_CHUNKS:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def draw_top_scores(self, current: float, top_scores: list) -> None:
+        """
+        draw the top current distances of several carson the screen
+        :param current: distance reached by the leader
+        :param top_scores: best distances reached by the cars
+        :return: None
+        """
+        # draw a black rectangle
+        pygame.draw.rect(self.screen, BLACK, pygame.Rect(0, SCREEN_HEIGHT, SCREEN_WIDTH, self.border))
+        # draw the description for the current car
+        description = f"Current: {current:.1f} m"
+        self.screen.blit(self.text(description), (0, SCREEN_HEIGHT))
+
+        for i, score in enumerate(top_scores):  # write the top distances on the rectangle
+            description = f"Top {i+1}: {score:.1f} m"
+            maxX = self.init_score_width + i * self.scores_width + self.font_top.size(description)[1]
+            if maxX > SCREEN_WIDTH:
+                break
+            self.screen.blit(self.text(description), (self.init_score_width + i * self.scores_width, SCREEN_HEIGHT))
+
+    def text(self, description: str) -> pygame.Surface:
+        """
+        Gives a text rendered with the score font, rendered once per text.
+        """
+        text_surface = self.texts.get(description)
+        if text_surface is None:
+            if len(self.texts) >= 1000:
+                self.texts.clear()
+            text_surface = self.font_top.render(description, True, WHITE)
+            self.texts[description] = text_surface
+        return text_surface
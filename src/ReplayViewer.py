@@ -0,0 +1,134 @@
+"""
+Replay of a generation recorded with `python3 main.py --record DIR`, without simulating it again.
+Usage (from src/): python3 ReplayViewer.py DIR/game_1/generation_1.json [--start SECONDS] [--speed FACTOR]
+Controls: space to pause, left/right arrows to go back/forward by 1 s, down/up arrows by 10 s,
+home/end to go to the start/end, ','/'.' to go back/forward by one frame, click on the timeline to go anywhere,
+escape to quit.
+"""
+import argparse
+from itertools import islice
+from typing import List
+
+import numpy as np
+import pygame
+from pygame.locals import *
+
+from Renderer import Renderer, SCREEN_WIDTH, WHITE, BLACK
+from Terrain import Terrain
+from TrajectoryRecorder import TrajectoryRecorder
+
+# Height of the timeline at the top of the window (in pixels)
+TIMELINE_HEIGHT = 6
+
+
+class ReplayViewer:
+    """
+    A class that replays a generation recorded by a TrajectoryRecorder, drawn by a Renderer,
+    with controls to pause and seek.
+    """
+
+    def __init__(self, index_path: str, speed: float = 1.0):
+        """
+        Initializes an object of class ReplayViewer, and opens the game window.
+        :param index_path: JSON file of the index of the recorded generation
+        :param speed: replay speed, 1 for the simulated time
+        """
+        self.index, self.frames = TrajectoryRecorder.load(index_path)
+        self.tiles = list(islice(Terrain.generate_tiles(self.index["seed_terrain"], self.index["floor_tiles"]),
+                                 self.index["tiles"]))
+        self.cars = self.index["cars"]
+        # Last frame (excluded) at which each car is alive
+        self.ends = np.array([len(self.frames) if car["death_step"] is None else car["death_step"]
+                              for car in self.cars])
+        self.fps = speed / self.index["time_step"]
+        self.frame = 0
+        self.paused = False
+        self.leader = None
+        self.renderer = Renderer()
+        pygame.display.set_caption("INGI-Dakar 2k21 - replay of generation n°{}".format(self.index["generation"]))
+
+    def run(self) -> None:
+        """
+        Plays the generation until the window is closed.
+        """
+        while True:
+            self.seek(self.renderer.check_events())
+            self.draw()
+            pygame.display.flip()
+            self.renderer.clock.tick(self.fps)
+            if not self.paused and self.frame < len(self.frames) - 1:
+                self.frame += 1
+
+    def seek(self, events: List[pygame.event.Event]) -> None:
+        """
+        Moves in the generation according to the keys pressed and the clicks on the timeline.
+        :param events: the events of the window
+        """
+        second = int(round(1 / self.index["time_step"]))
+        moves = {K_LEFT: -second, K_RIGHT: second, K_DOWN: -10 * second, K_UP: 10 * second, K_COMMA: -1, K_PERIOD: 1}
+        for event in events:
+            if event.type == KEYDOWN:
+                if event.key == K_SPACE:
+                    self.paused = not self.paused
+                elif event.key == K_HOME:
+                    self.frame = 0
+                elif event.key == K_END:
+                    self.frame = len(self.frames) - 1
+                elif event.key in moves:
+                    self.frame += moves[event.key]
+            elif event.type == MOUSEBUTTONDOWN and event.pos[1] < TIMELINE_HEIGHT * 3:
+                self.frame = int(event.pos[0] / SCREEN_WIDTH * len(self.frames))
+        self.frame = max(0, min(len(self.frames) - 1, self.frame))
+
+    def draw(self) -> None:
+        """
+        Draws the current frame, as the Renderer draws a Simulation.
+        """
+        frame = self.frames[self.frame]
+        alive = np.flatnonzero(self.ends > self.frame)
+        leader = self.find_leader(frame, alive)
+        # The camera follows the center of the chassis of the leader, where it died if it is dead
+        chassis_x, chassis_y, angle = self.frames[max(0, min(self.frame, self.ends[leader] - 1)), leader, 0:3]
+        local_x, local_y = self.cars[leader]["local_center"] or (0.0, 0.0)
+        c, s = np.cos(angle), np.sin(angle)
+        cars = [(self.cars[i]["chassis_vertex"], self.cars[i]["wheel_radius"],
+                 [tuple(float(value) for value in frame[i, j:j + 3]) for j in range(0, 9, 3)]) for i in alive]
+        distances = frame[:, TrajectoryRecorder.max_dist_value]
+        self.renderer.draw_frame(float(chassis_x + c * local_x - s * local_y),
+                                 float(chassis_y + s * local_x + c * local_y), self.tiles, cars,
+                                 float(distances[leader]), [float(d) for d in np.sort(distances)[::-1][:5]])
+        # Timeline, with the current time
+        screen = self.renderer.screen
+        pygame.draw.rect(screen, BLACK, pygame.Rect(0, 0, SCREEN_WIDTH, TIMELINE_HEIGHT))
+        pygame.draw.rect(screen, WHITE, pygame.Rect(0, 0, int(SCREEN_WIDTH * (self.frame + 1) / len(self.frames)),
+                                                    TIMELINE_HEIGHT))
+        description = "{:.1f} s{}".format(self.frame * self.index["time_step"], " (paused)" if self.paused else "")
+        screen.blit(self.renderer.text(description), (0, TIMELINE_HEIGHT))
+
+    def find_leader(self, frame: np.ndarray, alive: np.ndarray) -> int:
+        """
+        Gives the leader at a frame, as the Leaderboard does: the living car that went the furthest,
+        the last one in order in case of a tie, or the last leader when all the cars are dead.
+        :param frame: the recorded frame
+        :param alive: indices of the living cars
+        :return: the index of the leader
+        """
+        if len(alive):
+            distances = frame[alive, TrajectoryRecorder.max_dist_value]
+            self.leader = int(alive[len(alive) - 1 - np.argmax(distances[::-1])])
+        elif self.leader is None:
+            self.leader = int(np.argmax(frame[:, TrajectoryRecorder.max_dist_value]))
+        return self.leader
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("index", help="JSON index of the recorded generation, e.g. DIR/game_1/generation_1.json")
+    parser.add_argument("--start", help="Time of the generation where the replay starts, in seconds (default: 0)",
+                        type=float, default=0.0)
+    parser.add_argument("--speed", help="Replay speed, 1 for the simulated time (default: 1)", type=float,
+                        default=1.0)
+    args = parser.parse_args()
+    viewer = ReplayViewer(args.index, args.speed)
+    viewer.frame = max(0, min(len(viewer.frames) - 1, int(round(args.start / viewer.index["time_step"]))))
+    viewer.run()
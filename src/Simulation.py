@@ -0,0 +1,617 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Object physics
+from Box2D import b2World, b2_staticBody
+
+# Internal modules import
+from BodyPool import BodyPool
+from Car import Car
+from Checkpoint import Checkpoint
+from EventLog import EventLog
+from FitnessCache import FitnessCache
+from Genome import Genome
+from Leaderboard import Leaderboard
+from PopulationState import PopulationState
+from Profiler import Profiler
+from StreamingTerrain import StreamingTerrain
+from Terrain import Terrain
+from TrajectoryRecorder import TrajectoryRecorder
+
+import logging
+
+# Simulation parameters
+# Duration of one physics step (in simulated seconds)
+TIME_STEP = 1.0 / 60
+# Maximum duration of a run (in simulated seconds), converted to a number of physics steps
+MAX_SIMULATED_DURATION = 2 * 60
+# Optional wall-clock safety cap on a run (in seconds), None to disable.
+# When it is hit, scores depend on the machine speed and are no longer reproducible.
+MAX_RUN_DURATION = None
+# Number of velocity and position iterations of the Box2D solver in one physics step
+VELOCITY_ITERATIONS = 10
+POSITION_ITERATIONS = 10
+# Physics presets, trading accuracy for speed: keyword arguments of Simulation
+PHYSICS_PRESETS = {
+    "fast": {"time_step": 1.0 / 30, "velocity_iterations": 3, "position_iterations": 1},
+    "standard": {"time_step": TIME_STEP, "velocity_iterations": VELOCITY_ITERATIONS,
+                 "position_iterations": POSITION_ITERATIONS},
+    "precise": {"time_step": 1.0 / 120, "velocity_iterations": 20, "position_iterations": 20},
+}
+DEFAULT_PHYSICS = "standard"
+# Number of generations in one game
+NUMBER_OF_GENERATIONS = 6
+# Number of cars in a generation
+POPULATION_SIZE = 20
+# Successive halving: fraction of the living cars kept at the end of each round, and number of rounds
+HALVING_KEEP = 0.5
+HALVING_ROUNDS = 3
+# Distance (in meters) under which a car is considered as not moving by the stagnation detector
+STAGNATION_EPSILON = 0.05
+
+
+class Simulation:
+    """
+    A class that simulates the generations of a game, without any display.
+    It advances the b2World, tracks the state of the cars and creates the next generations.
+    """
+
+    def __init__(self, seed_terrain: int, log: Optional[logging.Logger] = None,
+                 max_sim_time: float = MAX_SIMULATED_DURATION, max_wall_time: Optional[float] = MAX_RUN_DURATION,
+                 cache: Optional[FitnessCache] = None, stagnation_window: Optional[float] = None,
+                 stagnation_epsilon: float = STAGNATION_EPSILON, single_body_terrain: bool = False,
+                 events: Optional[EventLog] = None, population_size: int = POPULATION_SIZE,
+                 workers: Optional[int] = None, checkpoint: Optional[str] = None, resume: bool = False,
+                 profiler: Optional[Profiler] = None, velocity_iterations: int = VELOCITY_ITERATIONS,
+                 position_iterations: int = POSITION_ITERATIONS, floor_tiles: int = Terrain.maxFloorTiles,
+                 time_step: float = TIME_STEP, halving_horizon: Optional[float] = None,
+                 halving_keep: float = HALVING_KEEP, halving_rounds: int = HALVING_ROUNDS,
+                 streaming_terrain: bool = False, body_pool: bool = False,
+                 record: Optional[str] = None):
+        """
+        Initializes an object of class Simulation, with its world and its terrain but without any car.
+        :param seed_terrain: seed for the terrain
+        :param log: logger of the game
+        :param max_sim_time: maximum duration of a run, in simulated seconds
+        :param max_wall_time: optional wall-clock safety cap on a run, in seconds (None to disable)
+        :param cache: optional FitnessCache, the cars found in it are not simulated again
+        :param stagnation_window: optional duration (in simulated seconds) after which a car that stayed within
+        stagnation_epsilon of the same distance is killed (None to disable)
+        :param stagnation_epsilon: distance (in meters) under which a car is considered as not moving
+        :param single_body_terrain: if True, the terrain is a single static body instead of one body per floor tile,
+        which is faster but gives slightly different results
+        :param events: optional EventLog where the kills and the generation scores are recorded
+        :param population_size: number of cars in the first generation
+        :param workers: if given, the generations are simulated in sharded mode by this many worker processes
+        (in this process if it is 1): each car is simulated alone in its own world, so that the results do not depend
+        on the number of workers, but they slightly differ from the ones of the cars simulated together
+        :param checkpoint: optional JSON file where a Checkpoint is written after each generation
+        :param resume: if True, the game is resumed from the checkpoint file, if it was written by a game
+        with the same seeds and settings; the scores are only the ones of an uninterrupted game in sharded mode
+        :param profiler: optional Profiler measuring the time spent in each phase of the game
+        :param velocity_iterations: number of velocity iterations of the Box2D solver in one physics step
+        :param position_iterations: number of position iterations of the Box2D solver in one physics step
+        :param floor_tiles: number of floor tiles of the terrain; another number gives another terrain
+        :param time_step: duration of one physics step (in simulated seconds); the health of a car that does not
+        move forward decreases in proportion, so that it dies after the same simulated time
+        :param halving_horizon: if given, the generations are evaluated by successive halving: after this duration
+        (in simulated seconds), only the best halving_keep fraction of the living cars goes on, the other ones are
+        killed with the distance they reached; the duration of the next round is doubled, for halving_rounds rounds
+        :param halving_keep: fraction of the living cars kept at the end of each round of successive halving
+        :param halving_rounds: number of rounds of successive halving, after which the living cars run normally
+        :param streaming_terrain: if True, the floor tiles are created when the leading car gets close to them,
+        and destroyed when they are far behind the last living car, so that the terrain has no end
+        (see StreamingTerrain); the results slightly differ from the ones on the whole terrain
+        :param body_pool: if True, the bodies of the dead cars are kept in a BodyPool and reused by the next cars,
+        instead of being destroyed and created again
+        :param record: optional directory where the trajectories of the cars of each generation are recorded
+        (see TrajectoryRecorder)
+        """
+        self.log = log if log is not None else logging.getLogger('game')
+        self.events = events if events is not None else EventLog()
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+        self.recorder = TrajectoryRecorder(record)
+        assert not (self.recorder.enabled and workers is not None), "The sharded mode cannot be recorded"
+        if self.profiler.enabled:
+            self.profiler.start_game()
+        self.seed_terrain = seed_terrain
+        self.cache = cache
+        self.cache_keys = []  # cache key of each car of the population, None for the cars found in the cache
+
+        self.score = 0.0
+        self.generation_scores = []  # score of each generation, in order
+        self.generation = 0
+        self.steps = 0  # physics steps done in the current generation
+        self.time_step = time_step
+        self.max_steps = int(round(max_sim_time / time_step))  # step budget of a run
+        self.max_wall_time = max_wall_time
+        self.stagnation_steps = None if stagnation_window is None else int(round(stagnation_window / time_step))
+        self.stagnation_epsilon = stagnation_epsilon
+        self.velocity_iterations = velocity_iterations
+        self.position_iterations = position_iterations
+        self.floor_tiles = floor_tiles
+        self.halving_steps = None if halving_horizon is None else max(1, int(round(halving_horizon / time_step)))
+        self.halving_keep = halving_keep
+        self.halving_rounds = halving_rounds
+        assert self.halving_steps is None or workers is None, "Successive halving is not available in sharded mode"
+        assert 0 < halving_keep <= 1, "The fraction of cars kept by successive halving must be in ]0, 1]"
+        self.health_decrement = max(1, int(round(PopulationState.health_decrement * time_step / TIME_STEP)))
+        self.timed_out = False  # whether the last run was stopped by the wall-clock cap
+        self.workers = workers
+        self.executor = None  # pool of the worker processes of the sharded mode, started with the first generation
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.world = b2World(gravity=(0, -9.81), doSleep=True)
+        self.body_pool = BodyPool(self.world, Car.start_position) if body_pool else None
+        self.population_size = population_size
+
+        self.killed = 0
+
+        self.single_body_terrain = single_body_terrain
+        self.streaming_terrain = streaming_terrain
+        assert not (single_body_terrain and streaming_terrain), "A streaming terrain has one body per floor tile"
+        if streaming_terrain:
+            self.floor = StreamingTerrain(self.world, seed_terrain, floor_tiles)  # updated as the cars move
+        else:
+            self.floor = Terrain(self.world, seed_terrain, floor_tiles)
+        with self.profiler.phase("terrain"):
+            self.terrain = self.floor.create_floor(single_body_terrain)
+
+        self.population = []  # Array of Car objects
+        self.state = None  # PopulationState of the population
+        self.leaderboard = None  # Leaderboard of the population
+        self.leader_coors = [0, 0]
+        self.last_leader = None
+
+    def run(self, next_generation: Callable, seed_car: int, observer=None) -> None:
+        """
+        Simulates all the generations of the game.
+        :param next_generation: function that creates the new generation of cars, based on the previous one.
+        :param seed_car: seed for the first generation of cars
+        :param observer: optional object whose on_step(simulation) method is called before each physics step,
+        e.g. to draw the world
+        """
+        first_generation = self.resume_checkpoint(seed_car) if self.resume else 0
+        if first_generation == 0:
+            with self.profiler.phase("first_generation"):
+                self.create_first_generation(seed_car)
+            # Initial state of the first generation
+            self.update_car_data()
+        try:
+            for self.generation in range(first_generation, NUMBER_OF_GENERATIONS):
+                self.log.info("Generation n°" + str(self.generation + 1))
+                if self.profiler.enabled:
+                    self.profiler.start_generation(self.generation + 1, self.body_count())
+                self.run_generation(observer)
+                self.end_generation(next_generation)
+                with self.profiler.phase("checkpoint"):
+                    self.save_checkpoint(seed_car)
+                if self.profiler.enabled:
+                    self.profiler.end_generation()
+        finally:
+            self.close()
+
+    def checkpoint_settings(self) -> list:
+        """
+        Gives the settings of this simulation that must be the same to resume one of its checkpoints.
+        """
+        return list(self.cache_settings()) + [self.population_size]
+
+    def save_checkpoint(self, seed_car: int) -> None:
+        """
+        Writes the checkpoint of the generations completed so far, if a checkpoint file is set.
+        :param seed_car: seed for the first generation of cars
+        """
+        if self.checkpoint is None:
+            return
+        Checkpoint(self.seed_terrain, seed_car, self.checkpoint_settings(), self.generation + 1, self.score,
+                   self.generation_scores, [Genome.from_car(car) for car in self.population],
+                   random.getstate()).save(self.checkpoint)
+
+    def resume_checkpoint(self, seed_car: int) -> int:
+        """
+        Restores the state of the game from its checkpoint file: scores, next population and random state.
+        :param seed_car: seed for the first generation of cars
+        :return: the number of generations already completed, 0 if there is no checkpoint to resume
+        """
+        checkpoint = None if self.checkpoint is None else Checkpoint.load(self.checkpoint)
+        if checkpoint is None:
+            return 0
+        if not checkpoint.matches(self.seed_terrain, seed_car, self.checkpoint_settings()):
+            self.log.warning("The checkpoint " + self.checkpoint + " was written with other seeds or settings, "
+                             "the game is started from the first generation")
+            return 0
+        self.log.info("Resuming after generation n°" + str(checkpoint.generation))
+        if self.workers is None:
+            # The results of Box2D depend on the bodies created and destroyed in the world before, which a new world
+            # does not have: only the sharded mode, where each car has its own world, resumes exactly
+            self.log.warning("The world of the generations before n°" + str(checkpoint.generation + 1) +
+                             " cannot be rebuilt, the resumed game will not reach the same score as an uninterrupted"
+                             " one (use --workers to resume exactly)")
+        self.score = checkpoint.score
+        self.generation_scores = checkpoint.generation_scores
+        self.generation = checkpoint.generation
+        self.set_population([genome.create_car(self.world) for genome in checkpoint.genomes])
+        random.setstate(checkpoint.random_state)
+        return checkpoint.generation
+
+    def close(self) -> None:
+        """
+        Stops the worker processes of the sharded mode, if they were started.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def options(self) -> dict:
+        """
+        Gives the keyword arguments of Simulation that change the distance reached by a car,
+        so that the same run can be reproduced in another Simulation.
+        """
+        return {
+            "max_sim_time": self.max_steps * self.time_step,
+            "max_wall_time": self.max_wall_time,
+            "stagnation_window": None if self.stagnation_steps is None else self.stagnation_steps * self.time_step,
+            "stagnation_epsilon": self.stagnation_epsilon,
+            "single_body_terrain": self.single_body_terrain,
+            "velocity_iterations": self.velocity_iterations,
+            "position_iterations": self.position_iterations,
+            "floor_tiles": self.floor_tiles,
+            "time_step": self.time_step,
+            "streaming_terrain": self.streaming_terrain,
+        }
+
+    def set_population(self, population: List[Car]) -> None:
+        """
+        Sets the Cars simulated in the next run.
+        :param population: the new population
+        """
+        self.population = population
+        if self.streaming_terrain:
+            # The cars start from the beginning of the terrain again
+            with self.profiler.phase("terrain"):
+                self.floor.create_floor()
+        self.state = PopulationState(population, Car.start_position.x, self.health_decrement)
+        self.leaderboard = Leaderboard(self.state)
+        self.leader = self.population[0]
+        self.killed = 0
+        self.apply_cache()
+
+    def cache_settings(self) -> tuple:
+        """
+        Gives the settings of this simulation that change the distance reached by a car, for the FitnessCache.
+        """
+        settings = (self.seed_terrain, self.max_steps)
+        if self.stagnation_steps is not None:
+            settings += (self.stagnation_steps, float(self.stagnation_epsilon).hex())
+        if self.single_body_terrain:
+            settings += ("single_body_terrain",)
+        if self.workers is not None:
+            settings += ("sharded",)
+        if (self.velocity_iterations, self.position_iterations) != (VELOCITY_ITERATIONS, POSITION_ITERATIONS):
+            settings += ("iterations", self.velocity_iterations, self.position_iterations)
+        if self.floor_tiles != Terrain.maxFloorTiles:
+            settings += ("floor_tiles", self.floor_tiles)
+        if self.time_step != TIME_STEP:
+            settings += ("time_step", float(self.time_step).hex())
+        if self.streaming_terrain:
+            settings += ("streaming_terrain",)
+        if self.halving_steps is not None:
+            settings += ("halving", self.halving_steps, float(self.halving_keep).hex(), self.halving_rounds)
+        return settings
+
+    def apply_cache(self) -> None:
+        """
+        Gives their cached distance to the cars of the population that were already simulated,
+        and removes them from the world.
+        """
+        self.cache_keys = []
+        if self.cache is None:
+            return
+        for car in self.population:
+            key = FitnessCache.key(car, *self.cache_settings())
+            max_dist = self.cache.get(key)
+            if max_dist is None:
+                self.cache_keys.append(key)
+            else:
+                self.cache_keys.append(None)
+                car.kill()
+                car.max_dist = max_dist
+                self.remove_car(car)
+
+    def run_generation(self, observer=None) -> None:
+        """
+        Simulates the current population until all its cars are dead, or the step budget is spent.
+        :param observer: optional object whose on_step(simulation) method is called before each physics step
+        """
+        if self.workers is not None:
+            with self.profiler.phase("shards"):
+                self.run_sharded_generation()
+            return
+        self.steps = 0
+        max_time = None if self.max_wall_time is None else time.time() + self.max_wall_time
+        # Steps at which the rounds of successive halving end: each round is twice as long as the previous one
+        cuts = [] if self.halving_steps is None else [self.halving_steps * (2 ** (i + 1) - 1)
+                                                      for i in range(self.halving_rounds)]
+        profiler = self.profiler
+        recorder = self.recorder
+        if recorder.enabled:
+            with profiler.phase("record"):
+                recorder.start_generation(self)
+        while True:
+            if observer is not None:
+                with profiler.phase("draw"):
+                    observer.on_step(self)
+
+            # Make Box2D simulate the physics of our world for one step.
+            with profiler.phase("step"):
+                self.world.Step(self.time_step, self.velocity_iterations, self.position_iterations)
+            self.steps += 1
+            if profiler.enabled:
+                profiler.count_step(self.world.contactCount)
+
+            with profiler.phase("update"):
+                self.update_car_data()
+            if cuts and self.steps == cuts[0]:
+                cuts.pop(0)
+                self.halve()
+            if self.streaming_terrain and self.steps % StreamingTerrain.update_interval == 0:
+                with profiler.phase("terrain"):
+                    self.update_floor()
+            if recorder.enabled:
+                with profiler.phase("record"):
+                    recorder.record(self)
+            self.timed_out = max_time is not None and time.time() > max_time
+            if self.killed == len(self.population) or self.steps >= self.max_steps or self.timed_out:
+                break
+        if recorder.enabled:
+            with profiler.phase("record"):
+                recorder.end_generation(self)
+        self.cache_results()
+
+    def run_sharded_generation(self) -> None:
+        """
+        Simulates the living cars of the current population in sharded mode: the cars are split into one shard
+        per worker, and each car is simulated alone in its own world with its own copy of the terrain.
+        The distances are then merged back into the population, whose cars are all dead at the end.
+        """
+        alive = [index for index, car in enumerate(self.population) if not car.isDead]
+        genomes = [Genome.from_car(self.population[index]) for index in alive]
+        shard_size = max(1, -(-len(genomes) // self.workers))  # ceiling division
+        # The shards are sent to the workers in the binary format of Genome
+        shards = [Genome.pack(genomes[i:i + shard_size]) for i in range(0, len(genomes), shard_size)]
+        options = self.options()
+        if self.workers == 1:
+            results = [simulate_shard(shard, self.seed_terrain, options) for shard in shards]
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            results = list(self.executor.map(simulate_shard, shards, [self.seed_terrain] * len(shards),
+                                             [options] * len(shards)))
+        results = [result for shard_results in results for result in shard_results]
+
+        self.steps = max((steps for _, steps, _ in results), default=0)
+        self.timed_out = any(timed_out for _, _, timed_out in results)
+        # Merge the results in the order of the deaths, as if the cars were simulated together
+        for (max_dist, steps, _), index in sorted(zip(results, alive), key=lambda item: (item[0][1], item[1])):
+            car = self.population[index]
+            car.max_dist = max_dist
+            car.kill()
+            self.remove_car(car)
+            if self.events.enabled:
+                self.events.emit("kill", generation=self.generation + 1, step=steps, car=index, max_dist=max_dist)
+        self.cache_results()
+
+    def cache_results(self) -> None:
+        """
+        Caches the distances reached by the cars of the run that were not found in the cache.
+        """
+        # Distances cut by the wall-clock cap are not reproducible, they are not cached
+        if self.cache is not None and not self.timed_out:
+            for car, key in zip(self.population, self.cache_keys):
+                if key is not None:
+                    self.cache.put(key, car.max_dist)
+
+    def end_generation(self, next_generation: Callable) -> None:
+        """
+        Records the score of the current generation and replaces it by the next one.
+        :param next_generation: function that creates the new generation of cars, based on the previous one.
+        """
+        generation_score = 0
+        for i in range(len(self.population)):
+            if self.population[i].max_dist > generation_score:
+                generation_score = self.population[i].max_dist
+            if self.population[i].max_dist > self.score:
+                self.score = self.population[i].max_dist
+        self.generation_scores.append(generation_score)
+        self.log.info("Generation n°" + str(self.generation + 1) + " score: " + str(generation_score))
+        if self.events.enabled:
+            self.events.emit("generation", generation=self.generation + 1, steps=self.steps, score=generation_score)
+        with self.profiler.phase("teardown"):
+            self.clear_population()
+        with self.profiler.phase("next_generation"):
+            population = next_generation(self.world, self.population)
+        with self.profiler.phase("population"):
+            self.set_population(population)
+        with self.profiler.phase("teardown"):
+            self.check_world()
+
+    def clear_population(self) -> None:
+        """
+        Ends the run of the cars still alive, e.g. when the step budget is spent,
+        and removes their bodies and joints from the world.
+        """
+        for car in self.population:
+            if not car.isDead:
+                car.kill()
+                self.remove_car(car)
+
+    def check_world(self) -> None:
+        """
+        Makes sure that the world only contains the terrain and the cars of the current population,
+        so that it does not grow from one generation to the next.
+        Bodies left by the creation of the population (e.g. cars created but not kept) are removed.
+        The inactive bodies of the BodyPool are kept.
+        """
+        # Set of the bodies to keep: Box2D bodies are hashed by the address of their C++ object
+        car_bodies = set() if self.body_pool is None else set(self.body_pool.bodies())
+        joint_count = 0  # one joint per wheel
+        for car in self.population:
+            if not car.isDead:
+                car_bodies.add(car.chassis.body)
+                car_bodies.update(wheel.body for wheel in car.wheels)
+                joint_count += len(car.wheels)
+        stale_bodies = [body for body in self.world.bodies if body.type != b2_staticBody and body not in car_bodies]
+        if stale_bodies:
+            self.log.warning(str(len(stale_bodies)) + " bodies that are not part of the population were removed")
+            for body in stale_bodies:
+                self.world.DestroyBody(body)
+        assert self.world.bodyCount == len(self.terrain) + len(car_bodies), "The world contains unexpected bodies"
+        assert self.world.jointCount == joint_count, "The world contains unexpected joints"
+
+    def body_count(self) -> int:
+        """
+        Gives the number of bodies simulated in the world, without the inactive bodies of the BodyPool.
+        """
+        if self.body_pool is None:
+            return self.world.bodyCount
+        return self.world.bodyCount - len(self.body_pool)
+
+    @property
+    def leader(self) -> Car:
+        """
+        The Car that is centered on the game GUI: the living Car that went the furthest,
+        or the last one that did when all the Cars are dead.
+        """
+        leader = self.leaderboard.leader()
+        if leader is not None:
+            self.last_leader = self.population[leader]
+        return self.last_leader
+
+    @leader.setter
+    def leader(self, car: Car) -> None:
+        self.last_leader = car
+
+    def update_car_data(self) -> None:
+        """
+        Updates the state of each Car in the game, in one batched pass over the PopulationState.
+        :return:
+        """
+        dead = self.state.update(self.steps, self.stagnation_steps, self.stagnation_epsilon)
+        for index in dead:
+            car = self.population[index]
+            # id you want to keep all the cars on the screen, (only for testing) comment the line below
+            self.remove_car(car)
+            self.log.debug("killed so far: %d", self.killed)
+            if self.events.enabled:
+                self.events.emit("kill", generation=self.generation + 1, step=self.steps, car=int(index),
+                                 max_dist=car.max_dist)
+
+    def update_floor(self) -> None:
+        """
+        Creates the floor tiles needed in front of the living cars of a streaming terrain,
+        and destroys the ones far behind them.
+        """
+        x = self.state.x[~self.state.dead]
+        if len(x):
+            self.floor.update(x.max(), x.min())
+
+    def halve(self) -> None:
+        """
+        Ends a round of successive halving: kills the living Cars that are not among the best ones.
+        Their distance is not their final one, so it is not cached.
+        """
+        dead = self.state.cut(self.halving_keep)
+        for index in dead:
+            car = self.population[index]
+            self.remove_car(car)
+            if self.cache_keys:
+                self.cache_keys[index] = None
+            if self.events.enabled:
+                self.events.emit("kill", generation=self.generation + 1, step=self.steps, car=int(index),
+                                 max_dist=car.max_dist, halving=True)
+
+    def remove_car(self, car: Car) -> None:
+        """
+        Removes the bodies of a dead Car from the world.
+        :param car: the dead Car
+        """
+        if self.body_pool is not None:
+            self.body_pool.release([wheel.body for wheel in car.wheels if wheel] + [car.chassis.body])
+        else:
+            for wheel in car.wheels:
+                if wheel:
+                    self.world.DestroyBody(wheel.body)  # remove wheels
+            self.world.DestroyBody(car.chassis.body)  # remove chassis
+        self.killed += 1
+
+    def sort_by_dist(self) -> None:
+        """
+        Sorts the population of Cars by their maximum distance reached.
+        """
+        self.population = sorted(self.population, key=lambda x: x.max_dist)
+        self.leader_coors = [self.population[0].chassis.body.worldCenter.x,
+                             self.population[0].chassis.body.worldCenter.y]
+        self.leader = self.population[0]
+
+    def create_first_generation(self, seed_car: int) -> None:
+        """
+        Creates the first Car population, which is a population with random attributes.
+        :param seed_car: seed for the random cars
+        """
+        self.set_population([Car.create_random_car(self.world, seed_car, i) for i in range(self.population_size)])
+
+
+def evaluate(genomes: Sequence, seed_terrain: int, max_sim_time: float = MAX_SIMULATED_DURATION,
+             cache: Optional[FitnessCache] = None, batch_size: Optional[int] = None) -> List[float]:
+    """
+    Simulates a list of cars together on one terrain, without generations, and gives their scores.
+    The cars are simulated as a first generation of a game, or as the cars of the sharded mode: their initial state
+    is taken into account before the first physics step, so that the same cars reach the same distances.
+    :param genomes: the cars to evaluate, as Genomes or as tuples (wheel_radius, wheel_vertex, motor_wheel_index,
+    chassis_vertex) with the same meaning as the arguments of Car; the chassis vertices can be b2Vec2 or (x, y) pairs
+    :param seed_terrain: seed for the terrain
+    :param max_sim_time: maximum duration of the run, in simulated seconds
+    :param cache: optional FitnessCache, the cars found in it are not simulated again
+    :param batch_size: if given, the cars are split into batches of this many cars, each one simulated
+    in its own world. The contacts between the cars of a world make it slower than linear in the number of cars
+    (300 cars take about 3 times as long together as in batches of 20), so many cars should be given in batches.
+    The distance reached by a car slightly depends on the other cars of its world, hence on its batch.
+    :return: the maximum distance reached by each car, in the order of the genomes
+    """
+    if not genomes:
+        return []
+    if batch_size is not None:
+        assert batch_size >= 1, "The batch size must be at least 1"
+        return [distance for start in range(0, len(genomes), batch_size)
+                for distance in evaluate(genomes[start:start + batch_size], seed_terrain, max_sim_time, cache)]
+    simulation = Simulation(seed_terrain, max_sim_time=max_sim_time, cache=cache)
+    population = [(genome if isinstance(genome, Genome) else Genome(*genome)).create_car(simulation.world)
+                  for genome in genomes]
+    simulation.set_population(population)
+    # Initial state, as for the first generation of a game
+    simulation.update_car_data()
+    simulation.run_generation()
+    return [car.max_dist for car in population]
+
+
+def simulate_shard(genomes: bytes, seed_terrain: int, options: dict) -> List[Tuple[float, int, bool]]:
+    """
+    Simulates a shard of the sharded mode: each car alone in a new world, possibly in a worker process.
+    :param genomes: the genomes of the cars, in the binary format of Genome.pack
+    :param seed_terrain: seed for the terrain
+    :param options: keyword arguments of the Simulations, as given by Simulation.options
+    :return: for each car, its maximum distance, the step at which its run ended and whether the run was stopped
+    by the wall-clock cap
+    """
+    results = []
+    for genome in Genome.unpack(genomes):
+        simulation = Simulation(seed_terrain, **options)
+        car = genome.create_car(simulation.world)
+        simulation.set_population([car])
+        simulation.update_car_data()
+        simulation.run_generation()
+        results.append((car.max_dist, simulation.steps, simulation.timed_out))
+    return results
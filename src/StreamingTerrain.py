@@ -0,0 +1,87 @@
+from typing import List, Tuple
+
+from Box2D import b2World, b2Body, b2Vec2
+
+from Terrain import Terrain
+
+
+class StreamingTerrain(Terrain):
+    """
+    A Terrain whose floor tiles are created lazily, when the leading car gets close to the end of the terrain,
+    and destroyed when they are far behind the last living car.
+    The tiles are the same ones as the ones of Terrain, with the same seed, but the terrain has no end:
+    after the first floor_tiles tiles, it keeps the same roughness.
+    """
+
+    # Default distances (in meters) kept in front of the leading car and behind the last living car
+    ahead = 50.0
+    behind = 20.0
+    # Number of physics steps between two updates, during which a car moves by a few meters at most
+    update_interval = 10
+
+    def __init__(self, world: b2World, seed: int, floor_tiles: int = Terrain.maxFloorTiles, ahead: float = ahead,
+                 behind: float = behind):
+        """
+        Initializes an object of class StreamingTerrain, without any floor tile.
+        :param world: b2World where the terrain will be created
+        :param seed: the seed of the terrain
+        :param floor_tiles: number of floor tiles over which the roughness of the terrain increases
+        :param ahead: distance (in meters) of terrain kept in front of the leading car
+        :param behind: distance (in meters) of terrain kept behind the last living car
+        """
+        super().__init__(world, seed, floor_tiles)
+        self.ahead = ahead
+        self.behind = behind
+        self.tile_generator = Terrain.generate_tiles(seed, floor_tiles)  # generator of the tiles never created so far
+        self.generated = []  # the tiles generated so far, created again at each generation
+        self.next_tile = 0  # index of the next tile to create
+        self.bodies = []  # the floor tiles in the world, from left to right
+        self.ends = []  # horizontal position of the right end of each floor tile in the world
+        self.end = 0.0  # horizontal position of the right end of the last tile created
+
+    def create_floor(self, single_body: bool = False) -> List[b2Body]:
+        """
+        Creates the first floor tiles, from the start of the terrain, removing the ones created before.
+        It is called again at the start of each generation, since the cars start from the beginning again.
+        :param single_body: not available for this terrain, which creates one body per floor tile
+        :return: the list of the floor tiles in the world, which is updated in place as the cars move
+        """
+        assert not single_body, "A streaming terrain creates one body per floor tile"
+        for body in self.bodies:
+            self.world.DestroyBody(body)
+        del self.bodies[:]
+        del self.ends[:]
+        self.next_tile = 0
+        self.end = -float("inf")
+        self.update(0.0, 0.0)
+        return self.bodies
+
+    def tiles(self) -> List[Tuple[float, ...]]:
+        """
+        Gives the floor tiles created so far, from the start of the terrain, as given by Terrain.generate_tiles.
+        """
+        return self.generated
+
+    def update(self, front: float, back: float) -> None:
+        """
+        Creates the floor tiles needed in front of the cars, and destroys the ones far behind them.
+        :param front: horizontal position of the leading car
+        :param back: horizontal position of the last living car
+        """
+        while self.end < front + self.ahead:
+            if self.next_tile == len(self.generated):
+                self.generated.append(next(self.tile_generator))
+            tile = self.generated[self.next_tile]
+            self.next_tile += 1
+            position = b2Vec2(tile[0], tile[1])
+            vertices = [b2Vec2(tile[i], tile[i + 1]) for i in range(2, Terrain.tile_size, 2)]
+            self.bodies.append(self.create_floor_tile(position, vertices))
+            self.end = position.x + max(vertex.x for vertex in vertices)
+            self.ends.append(self.end)
+        retired = 0
+        while retired < len(self.bodies) - 1 and self.ends[retired] < back - self.behind:
+            self.world.DestroyBody(self.bodies[retired])
+            retired += 1
+        if retired:
+            del self.bodies[:retired]
+            del self.ends[:retired]
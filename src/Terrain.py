@@ -1,7 +1,9 @@
 import random
 import math
+from array import array
+from itertools import islice
 from Box2D import b2World, b2Vec2, b2BodyDef, b2Body, b2FixtureDef, b2PolygonShape
-from typing import List
+from typing import Dict, Iterator, List, Tuple
 
 
 class Terrain:
@@ -12,60 +14,147 @@ class Terrain:
     # Default ground pieces values
     groundPieceWidth = 1.5
     groundPieceHeight = 0.15
+    maxFloorTiles = 200
+    # Collision category of the ground pieces
+    category_bits = 0x0001
+    # Number of floats describing a tile in a terrain geometry: its position, then its 4 vertices
+    tile_size = 10
 
-    def __init__(self, world: b2World, seed: int):
+    # Geometries of the terrains already generated, by seed and number of floor tiles
+    geometries: Dict[Tuple[int, int], array] = {}
+
+    def __init__(self, world: b2World, seed: int, floor_tiles: int = maxFloorTiles):
+        """
+        Initializes an object of class Terrain.
+        :param world: b2World where the terrain will be created
+        :param seed: the seed of the terrain
+        :param floor_tiles: number of floor tiles of the terrain; another number gives another terrain
+        """
         self.world = world
-        self.seed = seed 
+        self.seed = seed
+        self.floor_tiles = floor_tiles
+        self.tile_list = None  # the floor tiles, computed by tiles() when they are asked for
 
-    def create_floor(self) -> List[b2Body]:
+    @staticmethod
+    def geometry(seed: int, floor_tiles: int = maxFloorTiles) -> array:
         """
-        Creates the floor for the game.
-        :return: a list containing all the ground pieces that represent the game floor
+        Gives the geometry of the terrain generated with a seed. It is computed only once per seed.
+        :param seed: the seed of the terrain
+        :param floor_tiles: number of floor tiles of the terrain
+        :return: a flat array of float32 values with, for each floor tile, its position (x, y)
+        followed by its 4 vertices (x, y) relative to this position
+        """
+        geometry = Terrain.geometries.get((seed, floor_tiles))
+        if geometry is None:
+            geometry = Terrain.compute_geometry(seed, floor_tiles)
+            Terrain.geometries[(seed, floor_tiles)] = geometry
+        return geometry
+
+    @staticmethod
+    def compute_geometry(seed: int, floor_tiles: int = maxFloorTiles) -> array:
         """
-        maxFloorTiles = 200
-        last_tile = None
+        Computes the geometry of the terrain generated with a seed, without creating any body.
+        :param seed: the seed of the terrain
+        :param floor_tiles: number of floor tiles of the terrain
+        :return: the geometry of the terrain, as described in geometry()
+        """
+        geometry = array('f')
+        for tile in islice(Terrain.generate_tiles(seed, floor_tiles), floor_tiles):
+            geometry.extend(tile)
+        return geometry
+
+    @staticmethod
+    def generate_tiles(seed: int, floor_tiles: int = maxFloorTiles) -> Iterator[Tuple[float, ...]]:
+        """
+        Generates the floor tiles of the terrain generated with a seed, one after the other, without end.
+        The terrain gets rougher along the first floor_tiles tiles, and keeps the same roughness after them.
+        :param seed: the seed of the terrain
+        :param floor_tiles: number of floor tiles of the terrain, over which its roughness increases
+        :return: an iterator over the tiles, each one given as its position (x, y) followed by its 4 vertices (x, y)
+        relative to this position
+        """
+        maxFloorTiles = floor_tiles
         tile_position = b2Vec2(-1, 0)
-        floor_tiles = []
-        random.seed(self.seed)
-        for k in range(maxFloorTiles):
-            last_tile = self.create_floor_tile(tile_position, (random.random() * 3 - 1.5) * 1.2 * k / maxFloorTiles)
-            floor_tiles.append(last_tile)
-            last_fixture = last_tile.fixtures
+        rng = random.Random(seed)
+        k = 0
+        while True:
+            coords = []
+            coords.append(b2Vec2(0, 0))
+            coords.append(b2Vec2(0, Terrain.groundPieceHeight))
+            coords.append(b2Vec2(Terrain.groundPieceWidth, Terrain.groundPieceHeight))
+            coords.append(b2Vec2(Terrain.groundPieceWidth, 0))
+            roughness = min(k, maxFloorTiles)  # the terrain does not get rougher after maxFloorTiles tiles
+            newcoords = Terrain.rotate_floor_tile(coords, (rng.random() * 3 - 1.5) * 1.2 * roughness / maxFloorTiles)
+            vertices = b2PolygonShape(vertices=newcoords).vertices  # vertices in the order used by Box2D
+            yield (tile_position.x, tile_position.y) + tuple(coordinate for vertex in vertices for coordinate in vertex)
             # below is the fix for jagged edges: the vertex order was messed up, so sometimes the left bottom corner
             # would be connected to the top right corner of the previous tile
-            if last_fixture[0].shape.vertices[3] == b2Vec2(0, 0):
-                last_world_coords = last_tile.GetWorldPoint(last_fixture[0].shape.vertices[0])
+            if b2Vec2(vertices[3]) == b2Vec2(0, 0):
+                last_vertex = vertices[0]
+            else:
+                last_vertex = vertices[3]
+            tile_position = tile_position + b2Vec2(last_vertex)
+            k += 1
+
+    def tiles(self) -> List[Tuple[float, ...]]:
+        """
+        Gives the floor tiles of this terrain, as given by generate_tiles.
+        """
+        if self.tile_list is None:
+            geometry = Terrain.geometry(self.seed, self.floor_tiles)
+            self.tile_list = [tuple(geometry[i:i + Terrain.tile_size])
+                              for i in range(0, len(geometry), Terrain.tile_size)]
+        return self.tile_list
+
+    def create_floor(self, single_body: bool = False) -> List[b2Body]:
+        """
+        Creates the floor for the game.
+        :param single_body: if True, all the ground pieces are fixtures of a single static body,
+        which is faster to create and to simulate, but gives slightly different results
+        :return: a list containing all the ground pieces that represent the game floor
+        """
+        geometry = Terrain.geometry(self.seed, self.floor_tiles)
+        floor_tiles = []
+        if single_body:
+            floor_tiles.append(self.world.CreateBody(b2BodyDef()))
+        for i in range(0, len(geometry), Terrain.tile_size):
+            position = b2Vec2(geometry[i], geometry[i + 1])
+            vertices = [b2Vec2(geometry[j], geometry[j + 1]) for j in range(i + 2, i + Terrain.tile_size, 2)]
+            if single_body:
+                self.create_floor_fixture(floor_tiles[0], [position + vertex for vertex in vertices])
             else:
-                last_world_coords = last_tile.GetWorldPoint(last_fixture[0].shape.vertices[3])
-            tile_position = last_world_coords
+                floor_tiles.append(self.create_floor_tile(position, vertices))
         return floor_tiles
 
-    def create_floor_tile(self, position: b2Vec2, angle: float) -> b2Body:
+    def create_floor_tile(self, position: b2Vec2, vertices: List[b2Vec2]) -> b2Body:
         """
         Creates a floor tile.
         :param position: the position of the floor tile
-        :param angle: the angle of the floor tile
+        :param vertices: the vertices of the floor tile, relative to its position
         :return: the newly created floor tile
         """
         body_def = b2BodyDef()
         # body_def.position.Set(position.x, position.y)
         body_def.position = position
         body = self.world.CreateBody(body_def)
+        self.create_floor_fixture(body, vertices)
+        return body
+
+    @staticmethod
+    def create_floor_fixture(body: b2Body, vertices: List[b2Vec2]) -> None:
+        """
+        Adds the fixture of a floor tile to a static body.
+        :param body: the static body
+        :param vertices: the vertices of the floor tile, relative to the body
+        """
         fix_def = b2FixtureDef()
-        fix_def.shape = b2PolygonShape()
         fix_def.friction = 0.5
-        coords = []
-        coords.append(b2Vec2(0, 0))
-        coords.append(b2Vec2(0, Terrain.groundPieceHeight))
-        coords.append(b2Vec2(Terrain.groundPieceWidth, Terrain.groundPieceHeight))
-        coords.append(b2Vec2(Terrain.groundPieceWidth, 0))
-        newcoords = self.rotate_floor_tile(coords, angle)
-        fix_def.shape = b2PolygonShape(vertices=newcoords)  # setAsArray alt
-
+        fix_def.filter.categoryBits = Terrain.category_bits
+        fix_def.shape = b2PolygonShape(vertices=vertices)  # setAsArray alt
         body.CreateFixture(fix_def)
-        return body
 
-    def rotate_floor_tile(self, coords: List[b2Vec2], angle: float) -> List[b2Vec2]:
+    @staticmethod
+    def rotate_floor_tile(coords: List[b2Vec2], angle: float) -> List[b2Vec2]:
         """
         Rototes q floor tile.
         :param coords: the coordinates of the floor tile to rotate
@@ -78,4 +167,4 @@ class Terrain:
             nc.x = math.cos(angle) * (coords[k].x) - math.sin(angle) * (coords[k].y)
             nc.y = math.sin(angle) * (coords[k].x) + math.cos(angle) * (coords[k].y)
             newcoords.append(nc)
-        return newcoords
\ No newline at end of file
+        return newcoords
@@ -0,0 +1,134 @@
+import json
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class TrajectoryRecorder:
+    """
+    A class that records the trajectories of the cars of each generation, so that a game can be replayed
+    (see ReplayViewer) without simulating it again.
+    At each frame (the initial state, then after each physics step), the position and the angle of the chassis
+    and of the wheels of each living car, and the distance reached by each car, are written to a NumPy file
+    of the generation, preallocated for the whole step budget and memory-mapped.
+    A small JSON index next to it describes the cars (features, death step, distance) and the terrain.
+    Without a directory, the recorder is disabled: callers check `enabled`, so that it costs nothing
+    when it is not used.
+    """
+
+    # Values recorded for each car at each frame: (x, y, angle) of the chassis and of the 2 wheels, then the distance
+    number_of_values = 10
+    max_dist_value = 9
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initializes an object of class TrajectoryRecorder.
+        :param directory: directory where the files of each generation are written, None to disable the recorder
+        """
+        self.directory = directory
+        self.enabled = directory is not None
+        self.frames = None  # memory-mapped frames of the current generation
+        self.frame = 0  # number of frames recorded in the current generation
+        self.death_steps = None  # step at which each car died, -1 for the living ones
+        self.local_centers = None  # center of mass of the chassis of each car, relative to its position
+        self.bodies = None  # bodies of the chassis and of the 2 wheels of each car
+
+    @staticmethod
+    def paths(directory: str, generation: int) -> Tuple[str, str]:
+        """
+        Gives the files of a recorded generation.
+        :param directory: directory of the recorder
+        :param generation: number of the generation, from 1
+        :return: the NumPy file of the frames, and the JSON file of the index
+        """
+        name = os.path.join(directory, "generation_{}".format(generation))
+        return name + ".npy", name + ".json"
+
+    @staticmethod
+    def load(index_path: str) -> Tuple[dict, np.ndarray]:
+        """
+        Loads a recorded generation.
+        :param index_path: JSON file of the index of the generation
+        :return: the index, and the recorded frames, memory-mapped read-only
+        """
+        with open(index_path) as f:
+            index = json.load(f)
+        frames = np.load(os.path.splitext(index_path)[0] + ".npy", mmap_mode="r")
+        return index, frames[:index["frames"]]
+
+    def start_generation(self, simulation) -> None:
+        """
+        Creates the file of the current generation of a Simulation, and records its initial state.
+        :param simulation: the Simulation
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        frames_path, _ = TrajectoryRecorder.paths(self.directory, simulation.generation + 1)
+        population = simulation.population
+        self.frames = np.lib.format.open_memmap(frames_path, mode="w+", dtype=np.float32,
+                                                shape=(simulation.max_steps + 1, len(population),
+                                                       TrajectoryRecorder.number_of_values))
+        self.frame = 0
+        self.death_steps = np.full(len(population), -1)
+        self.local_centers = [None if car.isDead else tuple(car.chassis.body.localCenter) for car in population]
+        self.bodies = [(car.chassis.body, car.wheels[0].body, car.wheels[1].body) for car in population]
+        self.record(simulation)
+
+    def record(self, simulation) -> None:
+        """
+        Records the current state of the cars of a Simulation as the next frame.
+        :param simulation: the Simulation
+        """
+        state = simulation.state
+        frame = self.frames[self.frame]
+        self.death_steps[state.dead & (self.death_steps < 0)] = simulation.steps
+        # The bodies of the dead cars are destroyed, only the living ones are recorded
+        alive = np.flatnonzero(~state.dead)
+        if len(alive):
+            # The position of the chassis is already in the state
+            values = []
+            extend = values.extend
+            bodies = self.bodies
+            for index in alive:
+                chassis, wheel0, wheel1 = bodies[index]
+                position0 = wheel0.position
+                position1 = wheel1.position
+                extend((chassis.angle, position0.x, position0.y, wheel0.angle, position1.x, position1.y, wheel1.angle))
+            frame[alive, 0] = state.x[alive]
+            frame[alive, 1] = state.y[alive]
+            frame[alive, 2:9] = np.array(values).reshape(len(alive), 7)
+        frame[:, TrajectoryRecorder.max_dist_value] = state.max_dist
+        self.frame += 1
+
+    def end_generation(self, simulation) -> None:
+        """
+        Writes the frames of the current generation of a Simulation, and its index.
+        :param simulation: the Simulation
+        """
+        self.frames.flush()
+        self.frames = None
+        self.bodies = None
+        _, index_path = TrajectoryRecorder.paths(self.directory, simulation.generation + 1)
+        cars = []
+        for i, car in enumerate(simulation.population):
+            cars.append({
+                "id": i,
+                "death_step": None if self.death_steps[i] < 0 else int(self.death_steps[i]),
+                "max_dist": float(car.max_dist),
+                "wheel_radius": [float(radius) for radius in car.wheel_radius],
+                "wheel_vertex": [int(vertex) for vertex in car.wheel_vertex],
+                "motor_wheel_index": int(car.motor_wheel_index),
+                "chassis_vertex": [[float(vertex[0]), float(vertex[1])] for vertex in car.chassis_vertex],
+                "local_center": self.local_centers[i],
+            })
+        index = {
+            "generation": simulation.generation + 1,
+            "frames": self.frame,
+            "time_step": simulation.time_step,
+            "seed_terrain": simulation.seed_terrain,
+            "floor_tiles": simulation.floor_tiles,
+            "tiles": len(simulation.floor.tiles()),
+            "cars": cars,
+        }
+        with open(index_path, "w") as f:
+            json.dump(index, f)
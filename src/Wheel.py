@@ -1,5 +1,7 @@
 # Object physics
 from Box2D import b2World, b2Vec2, b2BodyDef, b2FixtureDef, b2CircleShape, b2_dynamicBody
+from Terrain import Terrain
+from BodyPool import BodyPool
 
 
 class Wheel:
@@ -11,6 +13,9 @@ class Wheel:
     maxRadius = 0.5  # Maximum wheel radius
     minRadius = 0.2  # Minimum wheel radius
     density = 2  # Mass density of a wheel (fixed)
+    # Collision filtering: cars only collide with the terrain, never with each other
+    category_bits = 0x0002
+    mask_bits = Terrain.category_bits
 
     def __init__(self, world: b2World, radius: float, position: b2Vec2):
         """
@@ -28,6 +33,8 @@ class Wheel:
         fix_def.friction = 1
         fix_def.restitution = 0.2
         fix_def.filter.groupIndex = -1
+        fix_def.filter.categoryBits = Wheel.category_bits
+        fix_def.filter.maskBits = Wheel.mask_bits
 
-        self.body = world.CreateBody(body_def)
+        self.body = BodyPool.create_body(world, body_def)
         self.body.CreateFixture(fix_def)
@@ -1,12 +1,18 @@
 from time import sleep
-from typing import List
+from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from Game import Game
+from Simulation import STAGNATION_EPSILON, POPULATION_SIZE, PHYSICS_PRESETS, DEFAULT_PHYSICS, HALVING_KEEP, \
+    HALVING_ROUNDS
 from Car import Car
+from FitnessCache import FitnessCache
 from Box2D import b2World
-import logging
-from CustomFormatter import CustomFormatter
+from CustomFormatter import get_logger
+from EventLog import EventLog
+from Profiler import Profiler
 import matplotlib.pyplot as plt
 import argparse
+import os
 import sys
 
 # Number of games played
@@ -14,14 +20,7 @@ import sys
 number_of_games = 5
 
 # Logger
-ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
-ch.setFormatter(CustomFormatter())
-log = logging.getLogger('main')
-logging.basicConfig(level=logging.INFO)
-log.setLevel(logging.INFO)
-log.addHandler(ch)
-log.propagate = False
+log = get_logger('main')
 
 
 def parse_arguments():
@@ -50,6 +49,158 @@ def parse_arguments():
         type=int,
         default=666,
     )
+    parser.add_argument(
+        "--max_wall_time",
+        help="Wall-clock safety cap on a generation, in seconds (default: none)",
+        type=float,
+        default=None,
+    )
+    parser.add_argument(
+        "--population_size",
+        help="Number of cars in the first generation (default: {})".format(POPULATION_SIZE),
+        type=int,
+        default=POPULATION_SIZE,
+    )
+    parser.add_argument(
+        "--physics",
+        help="Physics preset, trading accuracy for speed (default: {})".format(DEFAULT_PHYSICS),
+        choices=sorted(PHYSICS_PRESETS),
+        default=DEFAULT_PHYSICS,
+    )
+    parser.add_argument(
+        "--jobs",
+        help="Number of games run in parallel worker processes, without UI (default: 1)",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--workers",
+        help="Simulate each generation in this many worker processes, each car in its own world, without UI "
+             "(default: all the cars in one world, in this process)",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--cache",
+        help="Do not simulate again the cars that were already simulated (default: cache disabled)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--cache_file",
+        help="JSON file where the cache of simulated cars is kept across runs (implies --cache)",
+        default=None,
+    )
+    parser.add_argument(
+        "--stagnation_window",
+        help="Kill the cars that did not move by more than the stagnation epsilon during this many simulated seconds "
+             "(default: disabled)",
+        type=float,
+        default=None,
+    )
+    parser.add_argument(
+        "--stagnation_epsilon",
+        help="Distance in meters under which a car is considered as not moving (default: {})".format(STAGNATION_EPSILON),
+        type=float,
+        default=STAGNATION_EPSILON,
+    )
+    parser.add_argument(
+        "--halving",
+        help="Evaluate the generations by successive halving, with a first round of this many simulated seconds, "
+             "after which only the best cars go on (default: disabled)",
+        type=float,
+        default=None,
+    )
+    parser.add_argument(
+        "--halving_keep",
+        help="Fraction of the living cars kept at the end of each round of successive halving (default: {})".format(
+            HALVING_KEEP),
+        type=float,
+        default=HALVING_KEEP,
+    )
+    parser.add_argument(
+        "--halving_rounds",
+        help="Number of rounds of successive halving, each one twice as long as the previous one (default: {})".format(
+            HALVING_ROUNDS),
+        type=int,
+        default=HALVING_ROUNDS,
+    )
+    parser.add_argument(
+        "--single_body_terrain",
+        help="Build the terrain as a single static body, faster but with slightly different results "
+             "(default: one body per floor tile)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--streaming_terrain",
+        help="Create the terrain as the cars move forward, without end, and remove it behind them "
+             "(default: the whole terrain of 200 floor tiles is created at the start)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--body_pool",
+        help="Reuse the bodies of the dead cars for the next generations instead of creating new ones, "
+             "with the same results (default: new bodies)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--render_process",
+        help="Draw the game in a separate process, so that the simulation does not wait for the display "
+             "(default: drawn between the physics steps)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--speed",
+        help="Initial speed of the UI, in physics steps per frame drawn, or max to draw at most 60 frames "
+             "per second without waiting. It can be changed with the keys 1 (1x), 2 (4x), 3 (16x) and 4 (max) "
+             "(default: 1)",
+        choices=["1", "4", "16", "max"],
+        default="1",
+    )
+    parser.add_argument(
+        "--render_every",
+        help="Only draw the generations whose number is a multiple of K, the others run at the maximum speed "
+             "(default: 1, all the generations are drawn)",
+        type=int,
+        default=1,
+        metavar="K",
+    )
+    parser.add_argument(
+        "--render_final",
+        help="Only draw the last generation, the others run at the maximum speed",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--events",
+        help="JSON lines file where the kills and the generation scores are recorded (default: disabled)",
+        default=None,
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Directory where the state of each game is saved after each generation (default: disabled)",
+        default=None,
+    )
+    parser.add_argument(
+        "--record",
+        help="Directory where the trajectories of the cars of each generation are recorded, "
+             "to replay them with ReplayViewer.py (default: disabled)",
+        default=None,
+    )
+    parser.add_argument(
+        "--resume",
+        help="Resume the games from the checkpoints of a previous run (requires --checkpoint), "
+             "with the same scores as an uninterrupted run only with --workers",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Measure the time spent in each phase of the games, and print a summary at the end (default: disabled)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile_file",
+        help="JSON file where the measures of --profile are written (implies --profile)",
+        default=None,
+    )
     parser.add_argument(
         "--easter",
         help="Mystery",
@@ -62,7 +213,88 @@ def parse_arguments():
         isDraw = False
     if not args.no_plot:
         show_plot = False
-    return isDraw, show_plot, args.seed_terrain, args.seed_car
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.population_size < 1:
+        parser.error("--population_size must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.resume and args.checkpoint is None:
+        parser.error("--resume requires --checkpoint")
+    if args.render_every < 1:
+        parser.error("--render_every must be at least 1")
+    if args.halving is not None and args.halving <= 0:
+        parser.error("--halving must be positive")
+    if not 0 < args.halving_keep <= 1:
+        parser.error("--halving_keep must be in ]0, 1]")
+    if args.single_body_terrain and args.streaming_terrain:
+        parser.error("--single_body_terrain and --streaming_terrain cannot be combined")
+    if args.halving is not None and args.workers is not None:
+        parser.error("--halving and --workers cannot be combined")
+    if args.record is not None and args.workers is not None:
+        parser.error("--record and --workers cannot be combined")
+    if args.jobs > 1 and args.workers is not None:
+        parser.error("--jobs and --workers cannot be combined")
+    if args.jobs > 1 and isDraw:
+        log.warning("The UI is disabled when games run in parallel (--jobs {})".format(args.jobs))
+        isDraw = False
+    if args.workers is not None and isDraw:
+        log.warning("The UI is disabled when generations are sharded (--workers {})".format(args.workers))
+        isDraw = False
+    args.cache = args.cache or args.cache_file is not None
+    args.profile = args.profile or args.profile_file is not None
+    return isDraw, show_plot, args
+
+
+def game_options(args: argparse.Namespace) -> dict:
+    """
+    Gives the options of the games set on the command line.
+    :param args: the parsed command line arguments
+    :return: the keyword arguments of Game, except the cache
+    """
+    return {
+        "max_wall_time": args.max_wall_time,
+        "stagnation_window": args.stagnation_window,
+        "stagnation_epsilon": args.stagnation_epsilon,
+        "single_body_terrain": args.single_body_terrain,
+        "streaming_terrain": args.streaming_terrain,
+        "body_pool": args.body_pool,
+        "render_process": args.render_process,
+        "speed": None if args.speed == "max" else int(args.speed),
+        "render_every": args.render_every,
+        "render_final": args.render_final,
+        "population_size": args.population_size,
+        "workers": args.workers,
+        "resume": args.resume,
+        "physics": args.physics,
+        "halving_horizon": args.halving,
+        "halving_keep": args.halving_keep,
+        "halving_rounds": args.halving_rounds,
+    }
+
+
+def checkpoint_file(args: argparse.Namespace, game_number: int) -> Optional[str]:
+    """
+    Gives the checkpoint file of a game.
+    :param args: the parsed command line arguments
+    :param game_number: number of the game, from 1
+    :return: the file, or None if the checkpoints are disabled
+    """
+    if args.checkpoint is None:
+        return None
+    return os.path.join(args.checkpoint, "game_{}.json".format(game_number))
+
+
+def record_directory(args: argparse.Namespace, game_number: int) -> Optional[str]:
+    """
+    Gives the directory where the trajectories of a game are recorded.
+    :param args: the parsed command line arguments
+    :param game_number: number of the game, from 1
+    :return: the directory, or None if the recording is disabled
+    """
+    if args.record is None:
+        return None
+    return os.path.join(args.record, "game_{}".format(game_number))
         
 
 def next_generation(world: b2World, population: List[Car]) -> List[Car]:
@@ -82,25 +314,93 @@ def next_generation(world: b2World, population: List[Car]) -> List[Car]:
     return new_population
 
 
+def run_game(game_number: int, seed_terrain: int, seed_car: int, use_cache: bool, cache_file: Optional[str],
+             events_file: Optional[str], checkpoint: Optional[str], record: Optional[str], profile: bool,
+             options: dict) -> Tuple[float, List[float], Optional[Profiler], Optional[dict]]:
+    """
+    Plays one game without UI, in a worker process.
+    :param game_number: number of the game, from 1
+    :param seed_terrain: seed for the terrain
+    :param seed_car: seed for the first generation of cars
+    :param use_cache: whether the cars already simulated are simulated again
+    :param cache_file: optional file where the cache is kept across runs, only read here: the main process saves
+    the entries of all the games
+    :param events_file: optional JSON lines file where the events of the game are recorded
+    :param checkpoint: optional file where the state of the game is saved after each generation
+    :param record: optional directory where the trajectories of the game are recorded
+    :param profile: whether the time spent in each phase of the game is measured
+    :param options: other keyword arguments of Game
+    :return: the score of the game, the score of each of its generations, the Profiler of the game, if any,
+    and the entries of its cache to save in the cache file, if any
+    """
+    cache = FitnessCache(cache_file) if use_cache else None
+    if cache is not None:
+        cache.path = None  # the games run at the same time, only the main process writes the file
+    events = EventLog(events_file, game=game_number)
+    profiler = Profiler() if profile else None
+    game = Game(next_generation, False, seed_terrain, seed_car, False, cache=cache, events=events,
+                checkpoint=checkpoint, record=record, profiler=profiler, **options)
+    return game.score, game.generation_scores, profiler, None if cache_file is None else cache.entries
+
+
 # Run games and compute final score
 if __name__ == "__main__":
-    isDraw, show_plot, seed_terrain, seed_car = parse_arguments()
+    isDraw, show_plot, args = parse_arguments()
+    options = game_options(args)
     games = []
     scores = []
     sum_scores = 0
-    for i in range(number_of_games):
-        log.info("\n"+"-"*20 + "\nGame n°" + str(i+1) + "\n" + "-"*20)
-        isLogged = True if i == 0 else False
-        game = Game(next_generation, isDraw, seed_terrain, seed_car, isLogged)
-        games.append(i + 1)
-        scores.append(game.score)
-        sum_scores += game.score
-        log.info("Game n°" + str(i + 1) + " score: " + str(game.score))
+    profiler = Profiler() if args.profile else None
+    if args.events is not None and not args.resume:
+        open(args.events, "w").close()  # the events of each game are appended to an empty file
+    if args.checkpoint is not None:
+        os.makedirs(args.checkpoint, exist_ok=True)
+    if args.jobs > 1:
+        # Games are independent, each one owns its b2World: play them in worker processes.
+        # Results are collected in game order, so the final score is the same as a sequential run.
+        with ProcessPoolExecutor(max_workers=min(args.jobs, number_of_games)) as executor:
+            results = executor.map(run_game, range(1, number_of_games + 1), [args.seed_terrain] * number_of_games,
+                                   [args.seed_car] * number_of_games, [args.cache] * number_of_games,
+                                   [args.cache_file] * number_of_games, [args.events] * number_of_games,
+                                   [checkpoint_file(args, i + 1) for i in range(number_of_games)],
+                                   [record_directory(args, i + 1) for i in range(number_of_games)],
+                                   [args.profile] * number_of_games, [options] * number_of_games)
+            cache = FitnessCache(args.cache_file) if args.cache_file is not None else None
+            for i, (score, generation_scores, game_profiler, cache_entries) in enumerate(results):
+                if profiler is not None:
+                    profiler.merge(game_profiler)
+                if cache is not None:
+                    cache.merge(cache_entries)
+                games.append(i + 1)
+                scores.append(score)
+                sum_scores += score
+                log.info("Game n°" + str(i + 1) + " score: " + str(score) + " (generations: " +
+                         ", ".join("{:.1f}".format(s) for s in generation_scores) + ")")
+            if cache is not None:
+                cache.save()
+    else:
+        # The cache is shared by all the games
+        cache = FitnessCache(args.cache_file) if args.cache else None
+        for i in range(number_of_games):
+            log.info("\n"+"-"*20 + "\nGame n°" + str(i+1) + "\n" + "-"*20)
+            isLogged = True if i == 0 else False
+            events = EventLog(args.events, game=i + 1)
+            game = Game(next_generation, isDraw, args.seed_terrain, args.seed_car, isLogged, cache=cache,
+                        events=events, checkpoint=checkpoint_file(args, i + 1), record=record_directory(args, i + 1),
+                        profiler=profiler, **options)
+            games.append(i + 1)
+            scores.append(game.score)
+            sum_scores += game.score
+            log.info("Game n°" + str(i + 1) + " score: " + str(game.score))
 
     # Final score is the average of each run's score
     final_score = sum_scores / number_of_games
     log.info("\n"+"-"*20 + "\nEnd of the game" + "\n" + "-"*20)
     log.info("Your final score is {}".format(final_score))
+    if profiler is not None:
+        log.info("Profile of the games:\n" + profiler.summary())
+        if args.profile_file is not None:
+            profiler.save(args.profile_file)
     if show_plot:  # To get time to see the plot
         plot = plt.figure(1)
         plt.xlabel("Game")